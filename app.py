@@ -1,4 +1,5 @@
-from flask import Flask, jsonify
+import hmac
+from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
@@ -30,12 +31,54 @@ def create_app(config_class=Config):
     app.register_blueprint(portfolio_bp, url_prefix='/api/portfolio')
     app.register_blueprint(notification_bp, url_prefix='/api/notifications')
     
+    # CLI commands
+    from services.stats_service import rebuild_review_stats_command
+    from services.notification_service import prune_notifications_command
+    app.cli.add_command(rebuild_review_stats_command)
+    app.cli.add_command(prune_notifications_command)
+    
     @app.route('/health', methods=['GET'])
     def health_check():
+        from services.circuit_breaker import breaker_stats
+        
         return jsonify({
             'status': 'healthy', 
             'service': 'CodeSage AI',
-            'version': '1.0.0'
+            'version': '1.0.0',
+            'ai_circuits': {name: stats['state'] for name, stats in breaker_stats().items()}
+        })
+    
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        # Cache, queue and rate-limit internals are for operators only
+        token = app.config.get('METRICS_TOKEN')
+        if not token:
+            return jsonify({'error': 'Not found'}), 404
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        
+        from utils.cache import analysis_cache, ai_review_cache, github_cache
+        from services.review_jobs import get_review_queue
+        from services.github_service import rate_limit
+        from services.notification_bus import notification_bus
+        from services.unread_counter import unread_counter
+        from services.analysis_executor import analysis_executor
+        from services.circuit_breaker import breaker_stats
+        from services.single_flight import ai_flights
+        
+        return jsonify({
+            'cache': {
+                'analysis': analysis_cache.stats(),
+                'ai_review': ai_review_cache.stats(),
+                'github': github_cache.stats()
+            },
+            'review_queue': get_review_queue().stats(),
+            'analysis_executor': analysis_executor.stats(),
+            'ai_circuits': breaker_stats(),
+            'ai_single_flight': ai_flights.stats(),
+            'github': rate_limit.stats(),
+            'notification_streams': notification_bus.connection_count(),
+            'unread_counter': unread_counter.stats()
         })
     
     @app.errorhandler(404)
@@ -53,4 +96,6 @@ if __name__ == '__main__':
     app = create_app()
     with app.app_context():
         db.create_all()
+    from services.review_jobs import init_review_jobs
+    init_review_jobs(app)
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
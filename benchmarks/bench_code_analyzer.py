@@ -0,0 +1,85 @@
+"""
+Benchmark CodeAnalyzer's Python analysis against the previous approach,
+where every radon metric re-parsed the source.
+
+    python -m benchmarks.bench_code_analyzer [--lines 12000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from radon.complexity import cc_visit  # noqa: E402
+from radon.metrics import h_visit, mi_visit  # noqa: E402
+from utils.code_analyzer import CodeAnalyzer  # noqa: E402
+
+SAMPLE = '''
+# Helpers for order {n}
+class Order{n}:
+    """An order with line items"""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def total(self, discount=0):
+        total = 0
+        for item in self.items:
+            if item.get('taxable'):
+                total += item['price'] * 1.2
+            elif item.get('free'):
+                continue
+            else:
+                total += item['price']
+        return total * (1 - discount)
+
+
+def parse_order_{n}(text):
+    try:
+        return eval(text)
+    except:
+        return None
+'''
+
+
+def build_source(lines):
+    """Synthetic module of roughly `lines` lines"""
+    block = SAMPLE.count('\n')
+    return ''.join(SAMPLE.format(n=n) for n in range(max(1, lines // block)))
+
+
+def legacy_parse(code):
+    """What _analyze_python used to do: one full parse per metric"""
+    cc_visit(code)
+    mi_visit(code, multi=True)
+    h_visit(code)
+
+
+def best_of(func, code, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(code)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=12000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    code = build_source(args.lines)
+    analyzer = CodeAnalyzer()
+    legacy = best_of(legacy_parse, code, args.repeat)
+    current = best_of(analyzer.compute, code, args.repeat)
+
+    print(f"{code.count(chr(10)) + 1} lines, best of {args.repeat}")
+    print(f"  legacy radon parsing only  {legacy:.3f}s")
+    print(f"  CodeAnalyzer.compute       {current:.3f}s (all metrics and issues)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Benchmark the review statistics paths against the previous approach, which
+loaded every CodeReview (and Portfolio) row to aggregate it in Python.
+
+    python -m benchmarks.bench_review_stats [--database-url URL] [--reviews 50000]
+
+The tables are created, seeded and dropped again, so point --database-url
+at a scratch database. It defaults to a temporary SQLite file.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from database import db  # noqa: E402
+from models.code_blob import CodeBlob  # noqa: E402
+from models.portfolio import Portfolio  # noqa: E402
+from models.review import CodeReview  # noqa: E402
+from models.user import User  # noqa: E402
+from services.stats_service import get_user_stats, rebuild_user_stats  # noqa: E402
+from utils.math_calculator import MetricsCalculator  # noqa: E402
+
+LANGUAGES = ('python', 'javascript', 'java', 'go', 'typescript')
+CODE = 'def handler(event):\n    return event\n'
+
+
+def seed(user_id, reviews, portfolios, feedback_kb):
+    """Insert one user's reviews in bulk, with ai_feedback of about feedback_kb KB each"""
+    rng = random.Random(42)
+    sha256 = CodeBlob.digest(CODE)
+    db.session.add(User(id=user_id, email=f'bench{user_id}@example.com', password_hash='-', name='Bench'))
+    db.session.add(CodeBlob(sha256=sha256, data=CodeBlob.compress(CODE), size=len(CODE), ref_count=reviews))
+    db.session.commit()
+
+    started = datetime.utcnow() - timedelta(minutes=reviews)
+    filler = 'x' * 1024
+    batch = []
+    for n in range(reviews):
+        batch.append({
+            'user_id': user_id,
+            'code_sha256': sha256,
+            'language': rng.choice(LANGUAGES),
+            'title': f'Review {n}',
+            'quality_score': rng.uniform(40, 100),
+            'complexity_score': rng.uniform(0, 20),
+            'maintainability_index': rng.uniform(20, 100),
+            'issues_found': rng.randint(0, 12),
+            'ai_feedback': {'summary': 'Looks fine', 'notes': [filler] * feedback_kb},
+            'review_data': {'metrics': list(range(50))},
+            'status': 'completed',
+            'created_at': started + timedelta(minutes=n)
+        })
+        if len(batch) == 5000:
+            db.session.execute(CodeReview.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(CodeReview.__table__.insert(), batch)
+
+    db.session.execute(Portfolio.__table__.insert(), [
+        {'user_id': user_id, 'project_name': f'Project {n}', 'tech_stack': ['flask'], 'created_at': started}
+        for n in range(portfolios)
+    ])
+    db.session.commit()
+
+
+def legacy_stats(user_id):
+    """What GET /api/reviews/stats used to do"""
+    reviews = CodeReview.query.filter_by(user_id=user_id, status='completed').all()
+    languages = {}
+    for review in reviews:
+        languages[review.language] = languages.get(review.language, 0) + 1
+    return {
+        'total_reviews': len(reviews),
+        'avg_quality_score': round(sum(r.quality_score for r in reviews) / len(reviews), 2),
+        'total_issues': sum(r.issues_found for r in reviews),
+        'languages': languages
+    }
+
+
+def legacy_user_metrics(user_id):
+    """What calculate_user_metrics plus calculate_complexity_distribution used to do"""
+    reviews = CodeReview.query.filter_by(user_id=user_id).all()
+    portfolio_projects = Portfolio.query.filter_by(user_id=user_id).all()
+
+    languages = {}
+    for review in reviews:
+        languages[review.language] = languages.get(review.language, 0) + 1
+    sorted_reviews = sorted(reviews, key=lambda x: x.created_at)
+    recent_avg = sum(r.quality_score for r in sorted_reviews[-5:]) / 5
+    previous_avg = sum(r.quality_score for r in sorted_reviews[-10:-5]) / 5
+
+    distribution = {'low': 0, 'medium': 0, 'high': 0, 'very_high': 0}
+    for review in CodeReview.query.filter_by(user_id=user_id).all():
+        complexity = review.complexity_score
+        bucket = 'low' if complexity < 5 else 'medium' if complexity < 10 else 'high' if complexity < 15 else 'very_high'
+        distribution[bucket] += 1
+    return {
+        'total_reviews': len(reviews),
+        'avg_quality_score': round(sum(r.quality_score for r in reviews) / len(reviews), 2),
+        'languages': languages,
+        'portfolio_projects': len(portfolio_projects),
+        'trend': recent_avg - previous_avg,
+        'complexity': distribution
+    }
+
+
+def sql_stats(user_id):
+    """GET /api/reviews/stats with SQL aggregates and no rollup"""
+    return {
+        **MetricsCalculator.review_totals(user_id),
+        'languages': MetricsCalculator.language_distribution(user_id)
+    }
+
+
+def rollup_rebuild(user_id):
+    """Backfill of the user_review_stats row (first access, or rebuild-review-stats)"""
+    rebuild_user_stats(user_id)
+    db.session.commit()
+
+
+def rollup_stats(user_id):
+    """GET /api/reviews/stats now: one primary key read of the rollup row"""
+    return get_user_stats(user_id).to_dict()
+
+
+def user_metrics(user_id):
+    """calculate_user_metrics plus calculate_complexity_distribution now"""
+    return {
+        **MetricsCalculator.calculate_user_metrics(user_id),
+        'complexity': MetricsCalculator.calculate_complexity_distribution(user_id)
+    }
+
+
+def measure(func, user_id):
+    """Wall time and peak traced Python memory of one call in a fresh session"""
+    db.session.remove()
+    tracemalloc.start()
+    started = time.perf_counter()
+    func(user_id)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', default=None)
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--portfolios', type=int, default=200)
+    parser.add_argument('--feedback-kb', type=int, default=4)
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        args.database_url = f'sqlite:///{scratch}'
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+
+    app = create_app(BenchConfig)
+    user_id = 1
+    with app.app_context():
+        db.create_all()
+        try:
+            started = time.perf_counter()
+            seed(user_id, args.reviews, args.portfolios, args.feedback_kb)
+            print(f"{db.engine.dialect.name}: seeded {args.reviews} reviews in {time.perf_counter() - started:.1f}s")
+
+            for label, func in (
+                ('stats, legacy (load all rows)', legacy_stats),
+                ('stats, SQL aggregates', sql_stats),
+                ('stats, rollup rebuild', rollup_rebuild),
+                ('stats, rollup read', rollup_stats),
+                ('user metrics, legacy', legacy_user_metrics),
+                ('user metrics, rollup', user_metrics),
+            ):
+                elapsed, peak = measure(func, user_id)
+                print(f"  {label:32} {elapsed:8.3f}s  peak {peak / 2 ** 20:8.1f} MB")
+        finally:
+            db.session.remove()
+            db.drop_all()
+    if scratch:
+        os.unlink(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark review and portfolio write throughput with one commit per write
+(unit_of_work) against the previous two commits per write.
+
+    python -m benchmarks.bench_unit_of_work [--database-url URL] [--writes 500] [--repeat 3]
+
+Run it against SQLite and Postgres, e.g.
+--database-url postgresql://localhost/codesage_bench. The tables are
+created and dropped again, so point it at a scratch database. It defaults
+to a temporary SQLite file.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from database import db, unit_of_work  # noqa: E402
+from models.portfolio import Portfolio  # noqa: E402
+from models.review import CodeReview  # noqa: E402
+from models.user import User  # noqa: E402
+from services.notification_service import notify  # noqa: E402
+from services.stats_service import record_review  # noqa: E402
+
+USER_ID = 1
+CODE = 'def handler(event):\n    return event\n'
+
+
+def new_review(n):
+    return CodeReview(
+        user_id=USER_ID, title=f'Review {n}', code=CODE, language='python', status='completed',
+        quality_score=80, issues_found=2, complexity_score=3
+    )
+
+
+def review_two_commits(n):
+    """What create_review used to do"""
+    review = new_review(n)
+    db.session.add(review)
+    record_review(review)
+    db.session.commit()
+    notify(USER_ID, f'Code review for "{review.title}" completed successfully', type='review_complete', link='/code-review')
+    db.session.commit()
+
+
+def review_unit_of_work(n):
+    review = new_review(n)
+    with unit_of_work() as session:
+        session.add(review)
+        record_review(review)
+        notify(USER_ID, f'Code review for "{review.title}" completed successfully', type='review_complete', link='/code-review')
+
+
+def portfolio_two_commits(n):
+    """What create_portfolio_project used to do"""
+    db.session.add(Portfolio(user_id=USER_ID, project_name=f'Project {n}'))
+    db.session.commit()
+    notify(USER_ID, f'Portfolio project "Project {n}" added successfully', type='portfolio_added', link='/portfolio')
+    db.session.commit()
+
+
+def portfolio_unit_of_work(n):
+    with unit_of_work() as session:
+        session.add(Portfolio(user_id=USER_ID, project_name=f'Project {n}'))
+        notify(USER_ID, f'Portfolio project "Project {n}" added successfully', type='portfolio_added', link='/portfolio')
+
+
+def writes_per_second(func, writes, repeat):
+    """Best of repeat runs of writes sequential calls, each request in a fresh session"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for n in range(writes):
+            func(n)
+            db.session.remove()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return writes / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', default=None)
+    parser.add_argument('--writes', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False).name
+        args.database_url = f'sqlite:///{scratch}'
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        try:
+            db.session.add(User(id=USER_ID, email='bench@example.com', password_hash='-', name='Bench'))
+            db.session.commit()
+
+            print(f"{db.engine.dialect.name}: {args.writes} sequential writes, best of {args.repeat}")
+            for label, before, after in (
+                ('review create', review_two_commits, review_unit_of_work),
+                ('portfolio create', portfolio_two_commits, portfolio_unit_of_work),
+            ):
+                old = writes_per_second(before, args.writes, args.repeat)
+                new = writes_per_second(after, args.writes, args.repeat)
+                print(f"  {label:18} two commits {old:8.1f}/s  unit_of_work {new:8.1f}/s  ({new / old:.2f}x)")
+        finally:
+            db.session.remove()
+            db.drop_all()
+    if scratch:
+        os.unlink(scratch)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,9 +11,107 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
-    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    # /metrics requires "Authorization: Bearer <METRICS_TOKEN>"; unset disables it
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # AI provider: gemini, openai (any OpenAI-compatible API) or stub (offline, canned replies)
+    AI_PROVIDER = os.environ.get('AI_PROVIDER') or 'gemini'
+    AI_MODEL = os.environ.get('AI_MODEL')  # unset: the provider's default model
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
-    AI_MODEL = os.environ.get('AI_MODEL') or 'gemini-1.5-flash'
+    GEMINI_API_BASE = os.environ.get('GEMINI_API_BASE') or 'https://generativelanguage.googleapis.com/v1beta'
+    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE') or 'https://api.openai.com/v1'
+    AI_STUB_LATENCY = float(os.environ.get('AI_STUB_LATENCY') or 0.5)
+    
     GITHUB_API_URL = 'https://api.github.com'
     GITHUB_CLIENT_ID = os.environ.get('GITHUB_CLIENT_ID')
     GITHUB_CLIENT_SECRET = os.environ.get('GITHUB_CLIENT_SECRET')
+    
+    # Caching
+    REDIS_URL = os.environ.get('REDIS_URL')
+    RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE') or 1024)
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL') or 86400)
+    COUNT_CACHE_TTL = int(os.environ.get('COUNT_CACHE_TTL') or 30)
+    
+    # Pagination
+    DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE') or 20)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 100)
+    
+    # Background review jobs
+    REVIEW_QUEUE_BACKEND = os.environ.get('REVIEW_QUEUE_BACKEND') or 'thread'
+    REVIEW_WORKERS = int(os.environ.get('REVIEW_WORKERS') or 4)
+    REVIEW_QUEUE_MAX_PENDING = int(os.environ.get('REVIEW_QUEUE_MAX_PENDING') or 100)
+    # Each process refreshes the heartbeat of the reviews it has queued every
+    # REVIEW_JOB_HEARTBEAT_SECONDS; reviews whose heartbeat is older than
+    # REVIEW_JOB_LEASE_SECONDS were lost with their process and are recovered (0 disables)
+    REVIEW_JOB_HEARTBEAT_SECONDS = int(os.environ.get('REVIEW_JOB_HEARTBEAT_SECONDS') or 30)
+    REVIEW_JOB_LEASE_SECONDS = int(os.environ.get('REVIEW_JOB_LEASE_SECONDS') or 90)
+    
+    # Batch reviews (several files packed into one AI prompt up to the token budget)
+    REVIEW_BATCH_MAX_FILES = int(os.environ.get('REVIEW_BATCH_MAX_FILES') or 50)
+    REVIEW_BATCH_MAX_BYTES = int(os.environ.get('REVIEW_BATCH_MAX_BYTES') or 1024 * 1024)
+    AI_BATCH_TOKEN_BUDGET = int(os.environ.get('AI_BATCH_TOKEN_BUDGET') or 8000)
+    AI_BATCH_CONCURRENCY = int(os.environ.get('AI_BATCH_CONCURRENCY') or 4)
+    
+    # Larger single files are split into chunks of about this many tokens, reviewed concurrently
+    AI_PROMPT_TOKEN_BUDGET = int(os.environ.get('AI_PROMPT_TOKEN_BUDGET') or 6000)
+    AI_CHUNK_CONCURRENCY = int(os.environ.get('AI_CHUNK_CONCURRENCY') or 4)
+    
+    # Static analysis worker processes per web worker (0 runs analysis in the
+    # request thread). By default the CPUs are shared among the WEB_CONCURRENCY
+    # gunicorn workers so the host is not oversubscribed
+    ANALYSIS_WORKERS = int(
+        os.environ.get('ANALYSIS_WORKERS')
+        or max(1, (os.cpu_count() or 1) // max(1, int(os.environ.get('WEB_CONCURRENCY') or 1)))
+    )
+    ANALYSIS_TIMEOUT = float(os.environ.get('ANALYSIS_TIMEOUT') or 10)
+    ANALYSIS_MAX_INPUT_BYTES = int(os.environ.get('ANALYSIS_MAX_INPUT_BYTES') or 512 * 1024)
+    ANALYSIS_MAX_JOBS_PER_WORKER = int(os.environ.get('ANALYSIS_MAX_JOBS_PER_WORKER') or 500)
+    
+    # Outbound HTTP (shared by the AI and GitHub clients)
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT') or 5)
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT') or 30)
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS') or 10)
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE') or 20)
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES') or 2)
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR') or 0.5)
+    
+    # AI client circuit breaker (per upstream endpoint) and adaptive timeout (per prompt kind)
+    AI_BREAKER_WINDOW = int(os.environ.get('AI_BREAKER_WINDOW') or 20)
+    AI_BREAKER_MIN_CALLS = int(os.environ.get('AI_BREAKER_MIN_CALLS') or 5)
+    AI_BREAKER_FAILURE_RATE = float(os.environ.get('AI_BREAKER_FAILURE_RATE') or 0.5)
+    AI_BREAKER_OPEN_SECONDS = float(os.environ.get('AI_BREAKER_OPEN_SECONDS') or 30)
+    AI_TIMEOUT_MIN = float(os.environ.get('AI_TIMEOUT_MIN') or 5)
+    AI_TIMEOUT_PERCENTILE = float(os.environ.get('AI_TIMEOUT_PERCENTILE') or 0.99)
+    AI_TIMEOUT_MULTIPLIER = float(os.environ.get('AI_TIMEOUT_MULTIPLIER') or 2)
+    
+    # Identical in-flight AI prompts share one upstream call (across workers with Redis);
+    # the result TTL only bounds how long a finished flight's waiters have to collect it
+    AI_SINGLE_FLIGHT_LOCK_TTL = int(os.environ.get('AI_SINGLE_FLIGHT_LOCK_TTL') or 60)
+    AI_SINGLE_FLIGHT_RESULT_TTL = int(os.environ.get('AI_SINGLE_FLIGHT_RESULT_TTL') or 30)
+    
+    # GitHub client and import
+    GITHUB_IMPORT_CONCURRENCY = int(os.environ.get('GITHUB_IMPORT_CONCURRENCY') or 5)
+    GITHUB_IMPORT_ITEM_TIMEOUT = float(os.environ.get('GITHUB_IMPORT_ITEM_TIMEOUT') or 35)
+    GITHUB_CACHE_SIZE = int(os.environ.get('GITHUB_CACHE_SIZE') or 2048)
+    GITHUB_CACHE_TTL = int(os.environ.get('GITHUB_CACHE_TTL') or 7 * 86400)
+    GITHUB_RATE_LIMIT_RESERVE = int(os.environ.get('GITHUB_RATE_LIMIT_RESERVE') or 10)
+    
+    # Notification stream (Server-Sent Events); the connection cap applies per worker process
+    SSE_MAX_CONNECTIONS_PER_USER = int(os.environ.get('SSE_MAX_CONNECTIONS_PER_USER') or 3)
+    SSE_HEARTBEAT_INTERVAL = float(os.environ.get('SSE_HEARTBEAT_INTERVAL') or 15)
+    SSE_MAX_STREAM_SECONDS = float(os.environ.get('SSE_MAX_STREAM_SECONDS') or 300)
+    
+    # Unread notification counter cache (Redis). Without Redis the count is read
+    # from the database, unless UNREAD_COUNT_LOCAL_CACHE=1 opts into a per-process
+    # cache, which is only correct when a single worker serves the app
+    UNREAD_COUNT_LOCAL_CACHE = bool(int(os.environ.get('UNREAD_COUNT_LOCAL_CACHE') or 0))
+    UNREAD_COUNT_CACHE_USERS = int(os.environ.get('UNREAD_COUNT_CACHE_USERS') or 10000)
+    UNREAD_COUNT_RECONCILE_SECONDS = float(os.environ.get('UNREAD_COUNT_RECONCILE_SECONDS') or 300)
+    
+    # Notification retention
+    NOTIFICATION_MAX_AGE_DAYS = int(os.environ.get('NOTIFICATION_MAX_AGE_DAYS') or 90)
+    NOTIFICATION_MAX_PER_USER = int(os.environ.get('NOTIFICATION_MAX_PER_USER') or 200)
+    NOTIFICATION_PRUNE_BATCH_SIZE = int(os.environ.get('NOTIFICATION_PRUNE_BATCH_SIZE') or 500)
+    NOTIFICATION_COALESCE_MINUTES = int(os.environ.get('NOTIFICATION_COALESCE_MINUTES') or 10)
+    NOTIFICATION_BULK_LIMIT = int(os.environ.get('NOTIFICATION_BULK_LIMIT') or 500)
@@ -1,3 +1,27 @@
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Run a block of writes as one transaction: commit once when the block
+    finishes, roll back if it raises. Nested blocks join the outermost one,
+    so helpers can use it without committing the caller's work early.
+    """
+    session = db.session
+    if session.info.get('unit_of_work'):
+        yield session
+        return
+
+    session.info['unit_of_work'] = True
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop('unit_of_work', None)
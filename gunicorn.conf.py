@@ -0,0 +1,18 @@
+import os
+
+# The SSE endpoints (/api/notifications/stream, /api/reviews/stream) hold a
+# request open for minutes. A sync worker would be blocked by each one, so
+# every worker serves requests from a pool of threads instead.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or 32)
+
+# Workers come from WEB_CONCURRENCY and the port from PORT (gunicorn defaults)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 60)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT') or 30)
+
+
+def post_worker_init(worker):
+    # Only serving workers recover lost reviews and run the heartbeat
+    # sweeper; `flask db upgrade` and other CLI commands must not claim jobs
+    from services.review_jobs import init_review_jobs
+    init_review_jobs(worker.wsgi)
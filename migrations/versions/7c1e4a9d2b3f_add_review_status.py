@@ -0,0 +1,28 @@
+"""Add review job status
+
+Revision ID: 7c1e4a9d2b3f
+Revises: 2bbd7f64846d
+Create Date: 2026-10-16 09:12:40.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4a9d2b3f'
+down_revision = '2bbd7f64846d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=20), server_default='completed', nullable=False))
+        batch_op.add_column(sa.Column('error', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.drop_column('error')
+        batch_op.drop_column('status')
@@ -0,0 +1,38 @@
+"""Add notifications table
+
+Revision ID: 9e5b1d7a3c62
+Revises: a41f6d0c8e27
+Create Date: 2026-10-16 14:02:09.551483
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e5b1d7a3c62'
+down_revision = 'a41f6d0c8e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The initial migration predates the notifications table; databases
+    # built with db.create_all() may already have it
+    if sa.inspect(op.get_bind()).has_table('notifications'):
+        return
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('read', sa.Boolean(), nullable=True),
+    sa.Column('link', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('notifications')
@@ -0,0 +1,40 @@
+"""Add user_review_stats rollup
+
+Revision ID: a41f6d0c8e27
+Revises: 7c1e4a9d2b3f
+Create Date: 2026-10-16 11:47:03.552910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6d0c8e27'
+down_revision = '7c1e4a9d2b3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_review_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_reviews', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('issue_sum', sa.Integer(), nullable=False),
+    sa.Column('languages', sa.JSON(), nullable=False),
+    sa.Column('complexity_low', sa.Integer(), nullable=False),
+    sa.Column('complexity_medium', sa.Integer(), nullable=False),
+    sa.Column('complexity_high', sa.Integer(), nullable=False),
+    sa.Column('complexity_very_high', sa.Integer(), nullable=False),
+    sa.Column('recent_scores', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Rows are backfilled lazily on first read, or eagerly with
+    # `flask rebuild-review-stats`
+
+
+def downgrade():
+    op.drop_table('user_review_stats')
@@ -0,0 +1,45 @@
+"""Add notification event sequence
+
+Revision ID: a8c4e2f61b37
+Revises: d6a2f83c1e95
+Create Date: 2026-10-16 23:12:48.503917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c4e2f61b37'
+down_revision = 'd6a2f83c1e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('notification_seq', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_seq', sa.Integer(), nullable=True))
+
+    # Existing event ids were notification ids; keep them so clients holding
+    # a Last-Event-ID resume where they left off
+    op.execute('UPDATE notifications SET event_seq = id')
+    op.execute(
+        'UPDATE users SET notification_seq = '
+        '(SELECT COALESCE(MAX(id), 0) FROM notifications WHERE notifications.user_id = users.id)'
+    )
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.alter_column('event_seq', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index('ix_notifications_user_event_seq', ['user_id', 'event_seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_event_seq')
+        batch_op.drop_column('event_seq')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('notification_seq')
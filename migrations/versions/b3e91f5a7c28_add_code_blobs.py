@@ -0,0 +1,124 @@
+"""Store review code in deduplicated, compressed code_blobs
+
+Revision ID: b3e91f5a7c28
+Revises: f17c2d84a6e3
+Create Date: 2026-10-16 17:22:41.306518
+
+"""
+import hashlib
+import zlib
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e91f5a7c28'
+down_revision = 'f17c2d84a6e3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+code_reviews = sa.table(
+    'code_reviews',
+    sa.column('id', sa.Integer),
+    sa.column('code', sa.Text),
+    sa.column('code_sha256', sa.String)
+)
+
+code_blobs = sa.table(
+    'code_blobs',
+    sa.column('sha256', sa.String),
+    sa.column('data', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+    sa.column('ref_count', sa.Integer),
+    sa.column('created_at', sa.DateTime)
+)
+
+
+def _backfill(conn):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(code_reviews.c.id, code_reviews.c.code)
+            .where(code_reviews.c.id > last_id)
+            .order_by(code_reviews.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        blobs = {}
+        for row in rows:
+            raw = (row.code or '').encode('utf-8')
+            sha256 = hashlib.sha256(raw).hexdigest()
+            blob = blobs.setdefault(sha256, {'raw': raw, 'refs': 0, 'ids': []})
+            blob['refs'] += 1
+            blob['ids'].append(row.id)
+
+        existing = {
+            sha256 for (sha256,) in conn.execute(
+                sa.select(code_blobs.c.sha256).where(code_blobs.c.sha256.in_(list(blobs)))
+            )
+        }
+        for sha256, blob in blobs.items():
+            if sha256 in existing:
+                conn.execute(
+                    code_blobs.update().where(code_blobs.c.sha256 == sha256)
+                    .values(ref_count=code_blobs.c.ref_count + blob['refs'])
+                )
+            else:
+                conn.execute(code_blobs.insert().values(
+                    sha256=sha256,
+                    data=zlib.compress(blob['raw'], 6),
+                    size=len(blob['raw']),
+                    ref_count=blob['refs'],
+                    created_at=datetime.utcnow()
+                ))
+            conn.execute(
+                code_reviews.update().where(code_reviews.c.id.in_(blob['ids']))
+                .values(code_sha256=sha256)
+            )
+
+
+def upgrade():
+    op.create_table('code_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('code_sha256', sa.String(length=64), nullable=True))
+
+    _backfill(op.get_bind())
+
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.alter_column('code_sha256', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index('ix_code_reviews_code_sha256', ['code_sha256'], unique=False)
+        batch_op.create_foreign_key('fk_code_reviews_code_sha256_code_blobs', 'code_blobs', ['code_sha256'], ['sha256'])
+        batch_op.drop_column('code')
+
+
+def downgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('code', sa.Text(), nullable=True))
+
+    conn = op.get_bind()
+    for sha256, data in conn.execute(sa.select(code_blobs.c.sha256, code_blobs.c.data)):
+        conn.execute(
+            code_reviews.update().where(code_reviews.c.code_sha256 == sha256)
+            .values(code=zlib.decompress(data).decode('utf-8'))
+        )
+
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.alter_column('code', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_constraint('fk_code_reviews_code_sha256_code_blobs', type_='foreignkey')
+        batch_op.drop_index('ix_code_reviews_code_sha256')
+        batch_op.drop_column('code_sha256')
+
+    op.drop_table('code_blobs')
@@ -0,0 +1,38 @@
+"""Add keyset pagination indexes
+
+Revision ID: c52b7e19f4a0
+Revises: 9e5b1d7a3c62
+Create Date: 2026-10-16 14:05:31.207716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52b7e19f4a0'
+down_revision = '9e5b1d7a3c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_code_reviews_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('portfolios', schema=None) as batch_op:
+        batch_op.create_index('ix_portfolios_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_notifications_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_created')
+
+    with op.batch_alter_table('portfolios', schema=None) as batch_op:
+        batch_op.drop_index('ix_portfolios_user_created')
+
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_code_reviews_user_created')
@@ -0,0 +1,30 @@
+"""Add review job owner and heartbeat
+
+Revision ID: d6a2f83c1e95
+Revises: b3e91f5a7c28
+Create Date: 2026-10-16 21:08:37.415602
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a2f83c1e95'
+down_revision = 'b3e91f5a7c28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('job_owner', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('job_heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_code_reviews_status_heartbeat', ['status', 'job_heartbeat_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('code_reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_code_reviews_status_heartbeat')
+        batch_op.drop_column('job_heartbeat_at')
+        batch_op.drop_column('job_owner')
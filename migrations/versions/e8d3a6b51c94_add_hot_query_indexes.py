@@ -0,0 +1,36 @@
+"""Add per-user hot query indexes
+
+Revision ID: e8d3a6b51c94
+Revises: c52b7e19f4a0
+Create Date: 2026-10-16 15:22:48.630194
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8d3a6b51c94'
+down_revision = 'c52b7e19f4a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_notifications_user_unread', ['user_id'], unique=False,
+            postgresql_where=sa.text('read = false'),
+            sqlite_where=sa.text('read = 0')
+        )
+
+    with op.batch_alter_table('portfolios', schema=None) as batch_op:
+        batch_op.create_index('ix_portfolios_user_github', ['user_id', 'github_url'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('portfolios', schema=None) as batch_op:
+        batch_op.drop_index('ix_portfolios_user_github')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_unread')
@@ -0,0 +1,26 @@
+"""Add notification group_count
+
+Revision ID: f17c2d84a6e3
+Revises: e8d3a6b51c94
+Create Date: 2026-10-16 16:40:12.884301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f17c2d84a6e3'
+down_revision = 'e8d3a6b51c94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('group_count', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_column('group_count')
@@ -0,0 +1,76 @@
+import hashlib
+import zlib
+from database import db
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+
+COMPRESSION_LEVEL = 6
+
+class CodeBlob(db.Model):
+    """
+    Submitted source code stored once per distinct content, keyed by its
+    sha256 and zlib-compressed. ref_count is the number of reviews that
+    point at the blob; it is deleted when the last one goes away.
+    """
+    __tablename__ = 'code_blobs'
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # uncompressed length in bytes
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def digest(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def compress(text):
+        return zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL)
+
+    @property
+    def text(self):
+        return zlib.decompress(self.data).decode('utf-8')
+
+    @classmethod
+    def acquire(cls, connection, sha256, text):
+        """
+        Add a reference to the blob for text, inserting it if needed. Uses
+        the flush's connection so it runs in the same transaction.
+        """
+        table = cls.__table__
+        values = {
+            'sha256': sha256,
+            'data': cls.compress(text),
+            'size': len(text.encode('utf-8')),
+            'ref_count': 1,
+            'created_at': datetime.utcnow()
+        }
+
+        dialect = connection.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # Single atomic upsert, safe against concurrent identical submissions
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(table).values(**values)
+            connection.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.sha256],
+                set_={'ref_count': table.c.ref_count + 1}
+            ))
+            return
+
+        updated = connection.execute(
+            table.update().where(table.c.sha256 == sha256).values(ref_count=table.c.ref_count + 1)
+        ).rowcount
+        if not updated:
+            connection.execute(table.insert().values(**values))
+
+    @classmethod
+    def release(cls, connection, sha256):
+        """Drop one reference, deleting the blob when none are left"""
+        table = cls.__table__
+        connection.execute(
+            table.update().where(table.c.sha256 == sha256).values(ref_count=table.c.ref_count - 1)
+        )
+        connection.execute(
+            table.delete().where(table.c.sha256 == sha256, table.c.ref_count <= 0)
+        )
@@ -3,6 +3,18 @@ from datetime import datetime
 
 class Notification(db.Model):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at', 'id'),
+        # Unread count / mark-all-read: partial index over unread rows only
+        db.Index(
+            'ix_notifications_user_unread', 'user_id',
+            postgresql_where=db.text('read = false'),
+            sqlite_where=db.text('read = 0')
+        ),
+        # Stream replay: WHERE user_id = ? AND event_seq > ? ORDER BY event_seq
+        db.Index('ix_notifications_user_event_seq', 'user_id', 'event_seq'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -10,6 +22,8 @@ class Notification(db.Model):
     type = db.Column(db.String(50), nullable=False)  # review_complete, portfolio_added, error
     read = db.Column(db.Boolean, default=False)
     link = db.Column(db.String(255))
+    group_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # repeats coalesced into this row
+    event_seq = db.Column(db.Integer, nullable=False)  # per-user SSE event id of its latest create/merge
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -19,5 +33,6 @@ class Notification(db.Model):
             'type': self.type,
             'read': self.read,
             'link': self.link,
+            'count': self.group_count,
             'created_at': self.created_at.isoformat()
         }
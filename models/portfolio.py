@@ -3,6 +3,12 @@ from datetime import datetime
 
 class Portfolio(db.Model):
     __tablename__ = 'portfolios'
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_portfolios_user_created', 'user_id', 'created_at', 'id'),
+        # GitHub import de-duplication: WHERE user_id = ? AND github_url ...
+        db.Index('ix_portfolios_user_github', 'user_id', 'github_url'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -1,12 +1,21 @@
 from database import db
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import load_only, selectinload
+from models.code_blob import CodeBlob
 
 class CodeReview(db.Model):
     __tablename__ = 'code_reviews'
+    __table_args__ = (
+        # Keyset pagination: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        db.Index('ix_code_reviews_user_created', 'user_id', 'created_at', 'id'),
+        # Recovery sweep: WHERE status IN ('pending', 'processing') AND job_heartbeat_at < ?
+        db.Index('ix_code_reviews_status_heartbeat', 'status', 'job_heartbeat_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    code = db.Column(db.Text, nullable=False)
+    code_sha256 = db.Column(db.String(64), db.ForeignKey('code_blobs.sha256'), nullable=False, index=True)
     language = db.Column(db.String(50), nullable=False)
     title = db.Column(db.String(200), nullable=True)
     quality_score = db.Column(db.Float, default=0)
@@ -15,8 +24,59 @@ class CodeReview(db.Model):
     issues_found = db.Column(db.Integer, default=0)
     ai_feedback = db.Column(db.JSON, nullable=True)
     review_data = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='completed', server_default='completed')  # pending, processing, completed, failed
+    error = db.Column(db.Text, nullable=True)
+    # Process that queued the job and when it last reported it alive
+    job_owner = db.Column(db.String(100), nullable=True)
+    job_heartbeat_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Source is stored deduplicated and compressed in code_blobs
+    blob = db.relationship(CodeBlob, viewonly=True)
+    
+    # Columns needed for list views; code, ai_feedback and review_data are left out
+    SUMMARY_COLUMNS = (
+        'id', 'user_id', 'title', 'language', 'quality_score', 'complexity_score',
+        'maintainability_index', 'issues_found', 'status', 'created_at'
+    )
+    
+    @classmethod
+    def summary_load_options(cls):
+        """Loader option that fetches only the summary columns"""
+        return load_only(*(getattr(cls, name) for name in cls.SUMMARY_COLUMNS))
+    
+    @classmethod
+    def code_load_options(cls):
+        """Loader option that fetches the code blobs for a list in one query"""
+        return selectinload(cls.blob)
+    
+    @property
+    def code(self):
+        pending = getattr(self, '_pending_code', None)
+        if pending is not None:
+            return pending
+        return self.blob.text if self.blob is not None else None
+    
+    @code.setter
+    def code(self, text):
+        # The blob row is written (or its ref_count bumped) when this review is flushed
+        self._pending_code = text
+        self.code_sha256 = CodeBlob.digest(text)
+    
+    def to_summary_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'language': self.language,
+            'quality_score': self.quality_score,
+            'complexity_score': self.complexity_score,
+            'maintainability_index': self.maintainability_index,
+            'issues_found': self.issues_found,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -29,5 +89,24 @@ class CodeReview(db.Model):
             'maintainability_index': self.maintainability_index,
             'issues_found': self.issues_found,
             'ai_feedback': self.ai_feedback,
+            'status': self.status,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
+
+
+@event.listens_for(CodeReview, 'before_insert')
+def _acquire_code_blob(mapper, connection, review):
+    CodeBlob.acquire(connection, review.code_sha256, review.code)
+
+
+@event.listens_for(CodeReview, 'before_update')
+def _swap_code_blob(mapper, connection, review):
+    history = inspect(review).attrs.code_sha256.history
+    if history.added and history.deleted and history.added[0] != history.deleted[0]:
+        CodeBlob.acquire(connection, history.added[0], review.code)
+        CodeBlob.release(connection, history.deleted[0])
+
+
+@event.listens_for(CodeReview, 'after_delete')
+def _release_code_blob(mapper, connection, review):
+    CodeBlob.release(connection, review.code_sha256)
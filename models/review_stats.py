@@ -0,0 +1,33 @@
+from database import db
+from datetime import datetime
+
+class UserReviewStats(db.Model):
+    __tablename__ = 'user_review_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_reviews = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    issue_sum = db.Column(db.Integer, nullable=False, default=0)
+    languages = db.Column(db.JSON, nullable=False, default=dict)  # {language: review count}
+    complexity_low = db.Column(db.Integer, nullable=False, default=0)        # complexity < 5
+    complexity_medium = db.Column(db.Integer, nullable=False, default=0)     # complexity 5-10
+    complexity_high = db.Column(db.Integer, nullable=False, default=0)       # complexity 10-15
+    complexity_very_high = db.Column(db.Integer, nullable=False, default=0)  # complexity > 15
+    recent_scores = db.Column(db.JSON, nullable=False, default=list)  # last 10 quality scores, newest first
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'total_reviews': self.total_reviews,
+            'avg_quality_score': round(self.score_sum / self.total_reviews, 2) if self.total_reviews else 0,
+            'total_issues': self.issue_sum,
+            'languages': dict(self.languages or {})
+        }
+
+    def complexity_distribution(self):
+        return {
+            'low': self.complexity_low,
+            'medium': self.complexity_medium,
+            'high': self.complexity_high,
+            'very_high': self.complexity_very_high
+        }
@@ -11,6 +11,7 @@ class User(db.Model):
     github_username = db.Column(db.String(100), nullable=True)
     bio = db.Column(db.Text, nullable=True)
     avatar_url = db.Column(db.String(255), nullable=True)
+    notification_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # last Notification.event_seq issued
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
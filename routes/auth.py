@@ -3,7 +3,7 @@ from flask_jwt_extended import create_access_token, create_refresh_token, jwt_re
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
 import traceback
-from database import db
+from database import db, unit_of_work
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -64,8 +64,8 @@ def signup():
             github_username=data.get('github_username')
         )
         
-        db.session.add(new_user)
-        db.session.commit()
+        with unit_of_work() as session:
+            session.add(new_user)
         
         # Generate tokens
         access_token = create_access_token(identity=new_user.id)
@@ -168,14 +168,13 @@ def update_profile():
         data = request.get_json()
         
         # Update allowed fields
-        if 'name' in data:
-            user.name = data['name'].strip()
-        if 'github_username' in data:
-            user.github_username = data['github_username'].strip()
-        if 'bio' in data:
-            user.bio = data['bio']
-        
-        db.session.commit()
+        with unit_of_work():
+            if 'name' in data:
+                user.name = data['name'].strip()
+            if 'github_username' in data:
+                user.github_username = data['github_username'].strip()
+            if 'bio' in data:
+                user.bio = data['bio']
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -1,16 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.review import CodeReview
-from models.notification import Notification
 from services.ai_service import AIService
-from utils.code_analyzer import CodeAnalyzer
-from database import db
+from services.analysis_executor import AnalysisInputTooLarge, AnalysisTimeout, analysis_executor
+from services.job_queue import QueueFullError
+from services.notification_service import notify
+from services.review_jobs import enqueue_review, job_owner_id
+from services.stats_service import get_user_stats, record_review, record_reviews, remove_review
+from utils.pagination import InvalidCursor, cached_total, keyset_page
+from utils.sse import SSE_HEADERS, sse_event
+from config import Config
+from database import db, unit_of_work
 from datetime import datetime
 
 review_bp = Blueprint('review', __name__)
 ai_service = AIService()
-code_analyzer = CodeAnalyzer()
 
 @review_bp.route('', methods=['POST'])
 @jwt_required()
@@ -28,8 +33,13 @@ def create_review():
         language = data.get('language', 'python')
         title = data.get('title', f'Code Review - {datetime.utcnow().strftime("%Y-%m-%d %H:%M")}')
         
-        # Basic code analysis
-        analysis = code_analyzer.analyze(code, language)
+        analysis_executor.check_size(code)
+        
+        if request.args.get('async', type=int):
+            return _create_review_job(current_user_id, code, language, title)
+        
+        # Basic code analysis (runs in the analysis worker pool)
+        analysis = analysis_executor.analyze(code, language)
         
         # AI-powered review
         ai_feedback = ai_service.review_code(code, language)
@@ -46,18 +56,16 @@ def create_review():
             complexity_score=analysis.get('complexity', 0)
         )
         
-        db.session.add(review)
-        db.session.commit()
-        
-        # Create notification
-        notification = Notification(
-            user_id=current_user_id,
-            message=f'Code review for "{title}" completed successfully',
-            type='review_complete',
-            link='/code-review'
-        )
-        db.session.add(notification)
-        db.session.commit()
+        # Review, stats rollup and notification commit together
+        with unit_of_work() as session:
+            session.add(review)
+            record_review(review)
+            notify(
+                current_user_id,
+                f'Code review for "{title}" completed successfully',
+                type='review_complete',
+                link='/code-review'
+            )
         
         return jsonify({
             'message': 'Code review completed',
@@ -66,30 +74,242 @@ def create_review():
             'ai_feedback': ai_feedback
         }), 201
         
+    except AnalysisInputTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _create_review_job(user_id, code, language, title):
+    """Persist a pending review and hand the analysis off to the job queue"""
+    review = CodeReview(
+        user_id=user_id,
+        title=title,
+        code=code,
+        language=language,
+        status='pending',
+        job_owner=job_owner_id(),
+        job_heartbeat_at=datetime.utcnow()
+    )
+    # The worker loads the row in its own session, so it is committed
+    # before the job is queued
+    with unit_of_work() as session:
+        session.add(review)
+    
+    try:
+        enqueue_review(current_app._get_current_object(), review.id)
+    except QueueFullError as e:
+        with unit_of_work() as session:
+            session.delete(review)
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    
+    return jsonify({
+        'message': 'Code review queued',
+        'job_id': review.id,
+        'status': review.status,
+        'status_url': f'/api/reviews/{review.id}/status'
+    }), 202
+
+@review_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_batch_review():
+    """
+    Review several files in one request: analysis runs across the worker
+    pool, small files share AI prompts, and all rows commit together
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        files = data.get('files')
+        
+        if not isinstance(files, list) or not files:
+            return jsonify({'error': 'files must be a non-empty list'}), 400
+        if len(files) > Config.REVIEW_BATCH_MAX_FILES:
+            return jsonify({'error': f'At most {Config.REVIEW_BATCH_MAX_FILES} files per batch'}), 400
+        
+        default_language = data.get('language', 'python')
+        items = []
+        total_bytes = 0
+        for position, item in enumerate(files, 1):
+            if not isinstance(item, dict) or not item.get('code'):
+                return jsonify({'error': f'File {position}: code is required'}), 400
+            items.append({
+                'name': item.get('name') or f'file {position}',
+                'code': item['code'],
+                'language': item.get('language') or default_language
+            })
+            analysis_executor.check_size(item['code'])
+            # The number of AI prompts grows with the total size, not the file count
+            total_bytes += len(item['code'].encode('utf-8'))
+            if total_bytes > Config.REVIEW_BATCH_MAX_BYTES:
+                return jsonify({'error': f'Batch is too large (limit {Config.REVIEW_BATCH_MAX_BYTES // 1024} KB of code)'}), 413
+        
+        analyses = analysis_executor.analyze_many([(item['code'], item['language']) for item in items])
+        feedback, ai_calls = ai_service.review_batch(items)
+        
+        batch_title = data.get('title', f'Batch Review - {datetime.utcnow().strftime("%Y-%m-%d %H:%M")}')
+        reviews = [
+            CodeReview(
+                user_id=current_user_id,
+                title=f'{batch_title}: {item["name"]}'[:200],
+                code=item['code'],
+                language=item['language'],
+                ai_feedback=ai_feedback,
+                review_data=analysis,
+                quality_score=analysis.get('quality_score', 0),
+                issues_found=analysis.get('issues_count', 0),
+                complexity_score=analysis.get('complexity', 0),
+                maintainability_index=analysis.get('maintainability_index', 0)
+            )
+            for item, analysis, ai_feedback in zip(items, analyses, feedback)
+        ]
+        
+        # Rows are flushed as one multi-row INSERT alongside a single notification
+        with unit_of_work() as session:
+            session.add_all(reviews)
+            record_reviews(current_user_id, reviews)
+            notify(
+                current_user_id,
+                f'Batch review "{batch_title}" of {len(reviews)} files completed',
+                type='review_complete',
+                link='/code-review'
+            )
+        
+        return jsonify({
+            'message': 'Batch review completed',
+            'reviews': [
+                dict(review.to_summary_dict(), ai_feedback=review.ai_feedback, analysis=analysis)
+                for review, analysis in zip(reviews, analyses)
+            ],
+            'ai_calls': ai_calls
+        }), 201
+        
+    except AnalysisInputTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@review_bp.route('/stream', methods=['POST'])
+@jwt_required()
+def stream_review():
+    """
+    Submit code for review and receive the result as Server-Sent Events:
+    the static analysis first, then the AI reply as it is generated
+    ('delta' text and completed 'field' values), and finally the saved
+    'review'.
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    if not data.get('code'):
+        return jsonify({'error': 'Code is required'}), 400
+    
+    code = data['code']
+    language = data.get('language', 'python')
+    title = data.get('title', f'Code Review - {datetime.utcnow().strftime("%Y-%m-%d %H:%M")}')
+    
+    try:
+        analysis = analysis_executor.analyze(code, language)
+    except AnalysisInputTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except AnalysisTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    
+    def generate():
+        yield sse_event('analysis', analysis)
+        
+        ai_feedback = None
+        for kind, payload in ai_service.stream_review(code, language):
+            if kind == 'feedback':
+                ai_feedback = payload
+            else:
+                yield sse_event(kind, payload)
+        
+        review = CodeReview(
+            user_id=current_user_id,
+            title=title,
+            code=code,
+            language=language,
+            ai_feedback=ai_feedback,
+            quality_score=analysis.get('quality_score', 0),
+            issues_found=analysis.get('issues_count', 0),
+            complexity_score=analysis.get('complexity', 0)
+        )
+        try:
+            with unit_of_work() as session:
+                session.add(review)
+                record_review(review)
+                notify(
+                    current_user_id,
+                    f'Code review for "{title}" completed successfully',
+                    type='review_complete',
+                    link='/code-review'
+                )
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+            return
+        
+        yield sse_event('review', review.to_dict())
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
 @review_bp.route('', methods=['GET'])
 @jwt_required()
 def get_reviews():
-    """Get all reviews for current user"""
+    """
+    Get reviews for current user (?fields=summary omits code and feedback).
+    Pass ?limit and ?cursor for keyset pagination; ?page/per_page is kept
+    for existing clients.
+    """
     try:
         current_user_id = get_jwt_identity()
+        summary = request.args.get('fields') == 'summary'
+        
+        query = CodeReview.query.filter_by(user_id=current_user_id)
+        if summary:
+            # Never fetch the code / feedback columns for list views
+            query = query.options(CodeReview.summary_load_options())
+        else:
+            query = query.options(CodeReview.code_load_options())
+        serialize = CodeReview.to_summary_dict if summary else CodeReview.to_dict
+        
+        if 'cursor' in request.args or 'limit' in request.args:
+            reviews, next_cursor = keyset_page(
+                query,
+                CodeReview,
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', type=int)
+            )
+            response = {
+                'reviews': [serialize(review) for review in reviews],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+            if request.args.get('include_total', type=int):
+                response['total'] = cached_total(CodeReview, current_user_id)
+            return jsonify(response), 200
+        
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        reviews = CodeReview.query.filter_by(user_id=current_user_id)\
-            .order_by(CodeReview.created_at.desc())\
+        # Existing clients rely on an exact total here, so it is not cached
+        reviews = query.order_by(CodeReview.created_at.desc(), CodeReview.id.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'reviews': [review.to_dict() for review in reviews.items],
+            'reviews': [serialize(review) for review in reviews.items],
             'total': reviews.total,
             'pages': reviews.pages,
             'current_page': page
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -109,6 +329,32 @@ def get_review(review_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@review_bp.route('/<int:review_id>/status', methods=['GET'])
+@jwt_required()
+def get_review_status(review_id):
+    """Poll the status of a queued review"""
+    try:
+        current_user_id = get_jwt_identity()
+        review = CodeReview.query.filter_by(id=review_id, user_id=current_user_id).first()
+        
+        if not review:
+            return jsonify({'error': 'Review not found'}), 404
+        
+        response = {
+            'job_id': review.id,
+            'status': review.status
+        }
+        if review.status == 'completed':
+            response['review'] = review.to_dict()
+            response['analysis'] = review.review_data
+        elif review.status == 'failed':
+            response['error'] = review.error
+        
+        return jsonify(response), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @review_bp.route('/<int:review_id>', methods=['DELETE'])
 @jwt_required()
 def delete_review(review_id):
@@ -120,8 +366,10 @@ def delete_review(review_id):
         if not review:
             return jsonify({'error': 'Review not found'}), 404
         
-        db.session.delete(review)
-        db.session.commit()
+        with unit_of_work() as session:
+            if review.status == 'completed':
+                remove_review(review)
+            session.delete(review)
         
         return jsonify({'message': 'Review deleted successfully'}), 200
         
@@ -136,31 +384,7 @@ def get_stats():
     try:
         current_user_id = get_jwt_identity()
         
-        reviews = CodeReview.query.filter_by(user_id=current_user_id).all()
-        
-        if not reviews:
-            return jsonify({
-                'total_reviews': 0,
-                'avg_quality_score': 0,
-                'total_issues': 0,
-                'languages': {}
-            }), 200
-        
-        total_reviews = len(reviews)
-        avg_score = sum(r.quality_score for r in reviews) / total_reviews
-        total_issues = sum(r.issues_found for r in reviews)
-        
-        # Language distribution
-        languages = {}
-        for review in reviews:
-            languages[review.language] = languages.get(review.language, 0) + 1
-        
-        return jsonify({
-            'total_reviews': total_reviews,
-            'avg_quality_score': round(avg_score, 2),
-            'total_issues': total_issues,
-            'languages': languages
-        }), 200
+        return jsonify(get_user_stats(current_user_id).to_dict()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
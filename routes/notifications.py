@@ -1,23 +1,126 @@
-from flask import Blueprint, request, jsonify
+import time
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from config import Config
 from models.notification import Notification
-from database import db
+from database import db, unit_of_work
+from services.notification_bus import TooManyConnections, notification_bus, record_bulk_change
+from services.unread_counter import unread_counter
+from utils.pagination import InvalidCursor, cached_total, keyset_page
+from utils.sse import SSE_HEADERS, sse_event
 
 notification_bp = Blueprint('notifications', __name__)
 
+def _count_unread(user_id):
+    """Unread count from the counter cache, loaded from the database on a miss"""
+    return unread_counter.get(
+        user_id,
+        lambda: Notification.query.filter_by(user_id=user_id, read=False).count()
+    )
+
 @notification_bp.route('', methods=['GET'])
 @jwt_required()
 def get_notifications():
     current_user_id = get_jwt_identity()
-    notifications = Notification.query.filter_by(user_id=current_user_id).order_by(Notification.created_at.desc()).all()
+    query = Notification.query.filter_by(user_id=current_user_id)
+    
+    # Keyset pagination is opt-in; without it the full list is returned as before
+    if 'cursor' in request.args or 'limit' in request.args:
+        try:
+            notifications, next_cursor = keyset_page(
+                query,
+                Notification,
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', type=int)
+            )
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = {
+            'notifications': [n.to_dict() for n in notifications],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+        if request.args.get('include_total', type=int):
+            response['total'] = cached_total(Notification, current_user_id)
+        return jsonify(response), 200
+    
+    notifications = query.order_by(Notification.created_at.desc()).all()
     return jsonify([n.to_dict() for n in notifications]), 200
 
+@notification_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_notifications():
+    """
+    Push new notifications and unread-count changes over Server-Sent Events.
+    EventSource cannot send headers, so the token may also be passed as ?jwt=.
+    Reconnecting clients send Last-Event-ID to receive what they missed.
+    """
+    current_user_id = get_jwt_identity()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    try:
+        subscription = notification_bus.subscribe(current_user_id)
+    except TooManyConnections as e:
+        return jsonify({'error': str(e)}), 429
+    
+    # Subscribe before reading the backlog so nothing is missed in between
+    try:
+        backlog = []
+        if last_event_id is not None:
+            # Event ids are Notification.event_seq, which a merge advances too
+            backlog = Notification.query.filter(
+                Notification.user_id == current_user_id,
+                Notification.event_seq > last_event_id
+            ).order_by(Notification.event_seq).limit(Config.MAX_PAGE_SIZE).all()
+            backlog = [(n.event_seq, n.group_count > 1, n.to_dict()) for n in backlog]
+        unread = _count_unread(current_user_id)
+    except Exception:
+        notification_bus.unsubscribe(subscription)
+        raise
+    finally:
+        # Do not hold a pooled connection for the lifetime of the stream
+        db.session.close()
+    
+    def generate():
+        sent_id = last_event_id or 0
+        deadline = time.monotonic() + Config.SSE_MAX_STREAM_SECONDS
+        try:
+            yield f'retry: {int(Config.SSE_HEARTBEAT_INTERVAL * 1000)}\n\n'
+            yield sse_event('unread_count', {'count': unread})
+            for event_seq, merged, notification in backlog:
+                sent_id = max(sent_id, event_seq)
+                yield sse_event('notification_updated' if merged else 'notification', notification, event_seq)
+            
+            while time.monotonic() < deadline:
+                payload = subscription.get(timeout=Config.SSE_HEARTBEAT_INTERVAL)
+                if subscription.lost:
+                    # Events were dropped: end here so the client reconnects
+                    # with the last id it received and replays the gap
+                    break
+                if payload is None:
+                    yield ': heartbeat\n\n'
+                    continue
+                if payload.get('id') is not None:
+                    if payload['id'] <= sent_id:
+                        continue
+                    sent_id = payload['id']
+                yield sse_event(payload['event'], payload['data'], payload.get('id'))
+        finally:
+            notification_bus.unsubscribe(subscription)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+    # A body that is never iterated (HEAD, a client gone before the first
+    # write) never reaches the generator's finally; release the slot on close
+    response.call_on_close(lambda: notification_bus.unsubscribe(subscription))
+    return response
+
 @notification_bp.route('/unread-count', methods=['GET'])
 @jwt_required()
 def get_unread_count():
     current_user_id = get_jwt_identity()
-    count = Notification.query.filter_by(user_id=current_user_id, read=False).count()
-    return jsonify({'count': count}), 200
+    return jsonify({'count': _count_unread(current_user_id)}), 200
 
 @notification_bp.route('/<int:notification_id>/read', methods=['PUT'])
 @jwt_required()
@@ -27,8 +130,8 @@ def mark_as_read(notification_id):
     if not notification:
         return jsonify({'error': 'Notification not found'}), 404
     
-    notification.read = True
-    db.session.commit()
+    with unit_of_work():
+        notification.read = True
     return jsonify({'message': 'Notification marked as read'}), 200
 
 @notification_bp.route('/<int:notification_id>', methods=['DELETE'])
@@ -39,14 +142,58 @@ def delete_notification(notification_id):
     if not notification:
         return jsonify({'error': 'Notification not found'}), 404
     
-    db.session.delete(notification)
-    db.session.commit()
+    with unit_of_work() as session:
+        session.delete(notification)
     return jsonify({'message': 'Notification deleted'}), 200
 
+def _requested_ids():
+    """Validated list of notification ids from the JSON body, or None"""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or len(ids) > Config.NOTIFICATION_BULK_LIMIT:
+        return None
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return None
+    return ids
+
+@notification_bp.route('/read', methods=['PUT'])
+@jwt_required()
+def mark_many_read():
+    current_user_id = get_jwt_identity()
+    ids = _requested_ids()
+    if ids is None:
+        return jsonify({'error': f'ids must be a list of 1-{Config.NOTIFICATION_BULK_LIMIT} notification ids'}), 400
+    
+    with unit_of_work() as session:
+        updated = Notification.query.filter_by(user_id=current_user_id, read=False)\
+            .filter(Notification.id.in_(ids))\
+            .update({'read': True}, synchronize_session=False)
+        record_bulk_change(session, current_user_id, -updated)
+    return jsonify({'message': 'Notifications marked as read', 'updated': updated}), 200
+
+@notification_bp.route('', methods=['DELETE'])
+@jwt_required()
+def delete_many_notifications():
+    current_user_id = get_jwt_identity()
+    ids = _requested_ids()
+    if ids is None:
+        return jsonify({'error': f'ids must be a list of 1-{Config.NOTIFICATION_BULK_LIMIT} notification ids'}), 400
+    
+    query = Notification.query.filter_by(user_id=current_user_id).filter(Notification.id.in_(ids))
+    with unit_of_work() as session:
+        unread = query.filter_by(read=False).count()
+        deleted = query.delete(synchronize_session=False)
+        record_bulk_change(session, current_user_id, -unread)
+    return jsonify({'message': 'Notifications deleted', 'deleted': deleted}), 200
+
 @notification_bp.route('/mark-all-read', methods=['PUT'])
 @jwt_required()
 def mark_all_read():
     current_user_id = get_jwt_identity()
-    Notification.query.filter_by(user_id=current_user_id, read=False).update({'read': True})
-    db.session.commit()
-    return jsonify({'message': 'All notifications marked as read'}), 200
+    # A delta rather than a reset to 0: a notification committed after the
+    # UPDATE is still unread
+    with unit_of_work() as session:
+        updated = Notification.query.filter_by(user_id=current_user_id, read=False)\
+            .update({'read': True}, synchronize_session=False)
+        record_bulk_change(session, current_user_id, -updated)
+    return jsonify({'message': 'All notifications marked as read', 'updated': updated}), 200
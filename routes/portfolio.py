@@ -1,10 +1,15 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
+from config import Config
 from models.portfolio import Portfolio
-from models.notification import Notification
 from services.ai_service import AIService
 from services.github_service import GitHubService
-from database import db
+from services.notification_service import notify
+from database import db, unit_of_work
+from utils.pagination import InvalidCursor, cached_total, keyset_page
 
 portfolio_bp = Blueprint('portfolio', __name__)
 ai_service = AIService()
@@ -38,18 +43,15 @@ def create_portfolio_project():
             image_url=data.get('image_url')
         )
         
-        db.session.add(project)
-        db.session.commit()
-        
-        # Create notification
-        notification = Notification(
-            user_id=current_user_id,
-            message=f'Portfolio project "{data["name"]}" added successfully',
-            type='portfolio_added',
-            link='/portfolio'
-        )
-        db.session.add(notification)
-        db.session.commit()
+        # Project and notification commit together
+        with unit_of_work() as session:
+            session.add(project)
+            notify(
+                current_user_id,
+                f'Portfolio project "{data["name"]}" added successfully',
+                type='portfolio_added',
+                link='/portfolio'
+            )
         
         return jsonify({
             'message': 'Project added to portfolio',
@@ -63,16 +65,35 @@ def create_portfolio_project():
 @portfolio_bp.route('', methods=['GET'])
 @jwt_required()
 def get_portfolio_projects():
-    """Get all portfolio projects for current user"""
+    """Get portfolio projects for current user (?limit and ?cursor paginate)"""
     try:
         current_user_id = get_jwt_identity()
-        projects = Portfolio.query.filter_by(user_id=current_user_id)\
-            .order_by(Portfolio.created_at.desc()).all()
+        query = Portfolio.query.filter_by(user_id=current_user_id)
+        
+        if 'cursor' in request.args or 'limit' in request.args:
+            projects, next_cursor = keyset_page(
+                query,
+                Portfolio,
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', type=int)
+            )
+            response = {
+                'projects': [project.to_dict() for project in projects],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+            if request.args.get('include_total', type=int):
+                response['total'] = cached_total(Portfolio, current_user_id)
+            return jsonify(response), 200
+        
+        projects = query.order_by(Portfolio.created_at.desc()).all()
         
         return jsonify({
             'projects': [project.to_dict() for project in projects]
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -106,20 +127,19 @@ def update_portfolio_project(project_id):
         data = request.get_json()
         
         # Update fields
-        if 'name' in data:
-            project.project_name = data['name']
-        if 'description' in data:
-            project.description = data['description']
-        if 'tech_stack' in data:
-            project.tech_stack = data['tech_stack']
-        if 'github_url' in data:
-            project.github_url = data['github_url']
-        if 'live_url' in data:
-            project.live_url = data['live_url']
-        if 'image_url' in data:
-            project.image_url = data['image_url']
-        
-        db.session.commit()
+        with unit_of_work():
+            if 'name' in data:
+                project.project_name = data['name']
+            if 'description' in data:
+                project.description = data['description']
+            if 'tech_stack' in data:
+                project.tech_stack = data['tech_stack']
+            if 'github_url' in data:
+                project.github_url = data['github_url']
+            if 'live_url' in data:
+                project.live_url = data['live_url']
+            if 'image_url' in data:
+                project.image_url = data['image_url']
         
         return jsonify({
             'message': 'Project updated successfully',
@@ -141,8 +161,8 @@ def delete_portfolio_project(project_id):
         if not project:
             return jsonify({'error': 'Project not found'}), 404
         
-        db.session.delete(project)
-        db.session.commit()
+        with unit_of_work() as session:
+            session.delete(project)
         
         return jsonify({'message': 'Project deleted successfully'}), 200
         
@@ -150,6 +170,44 @@ def delete_portfolio_project(project_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _generate_descriptions(repos):
+    """
+    Generate portfolio descriptions for repos concurrently with bounded fan-out.
+    Returns ({html_url: description}, [names that timed out]).
+    """
+    if not repos:
+        return {}, []
+    
+    workers = max(1, min(Config.GITHUB_IMPORT_CONCURRENCY, len(repos)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='github-import')
+    futures = []
+    for repo in repos:
+        project_data = {
+            'name': repo['name'],
+            'tech_stack': repo.get('language', 'Unknown'),
+            'features': repo.get('description', '')
+        }
+        futures.append((repo, project_data, executor.submit(ai_service.generate_portfolio_description, project_data)))
+    
+    # Each item gets the per-item timeout, measured from when its batch could start
+    waves = -(-len(repos) // workers)
+    deadline = time.monotonic() + Config.GITHUB_IMPORT_ITEM_TIMEOUT * waves
+    
+    descriptions = {}
+    timed_out = []
+    try:
+        for repo, project_data, future in futures:
+            try:
+                descriptions[repo['html_url']] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except Exception:
+                future.cancel()
+                timed_out.append(repo['name'])
+                descriptions[repo['html_url']] = ai_service.basic_portfolio_description(project_data)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return descriptions, timed_out
+
 @portfolio_bp.route('/import-github', methods=['POST'])
 @jwt_required()
 def import_from_github():
@@ -162,43 +220,45 @@ def import_from_github():
         if not github_username:
             return jsonify({'error': 'GitHub username is required'}), 400
         
-        # Fetch repositories from GitHub
-        repos = github_service.get_user_repositories(github_username)
-        
-        imported_count = 0
-        for repo in repos[:10]:  # Limit to 10 repos
-            # Check if already exists
-            existing = Portfolio.query.filter_by(
-                user_id=current_user_id,
-                github_url=repo['html_url']
-            ).first()
-            
-            if not existing:
-                # Generate description
-                project_data = {
-                    'name': repo['name'],
-                    'tech_stack': repo.get('language', 'Unknown'),
-                    'features': repo.get('description', '')
-                }
-                description = ai_service.generate_portfolio_description(project_data)
-                
-                project = Portfolio(
-                    user_id=current_user_id,
-                    project_name=repo['name'],
-                    description=description,
-                    tech_stack=[repo.get('language')] if repo.get('language') else [],
-                    github_url=repo['html_url'],
-                    image_url=None
-                )
-                
-                db.session.add(project)
-                imported_count += 1
-        
-        db.session.commit()
+        # Fetch repositories from GitHub, stopping once 10 non-fork repos are found
+        repos = github_service.get_user_repositories(github_username, limit=10)
         
+        # Skip repos that are already in the portfolio (one query for all of them)
+        existing_urls = {
+            url for (url,) in db.session.query(Portfolio.github_url).filter(
+                Portfolio.user_id == current_user_id,
+                Portfolio.github_url.isnot(None)
+            )
+        }
+        new_repos = []
+        for repo in repos:
+            if repo['html_url'] not in existing_urls:
+                existing_urls.add(repo['html_url'])
+                new_repos.append(repo)
+        
+        descriptions, timed_out = _generate_descriptions(new_repos)
+        
+        rows = [
+            {
+                'user_id': current_user_id,
+                'project_name': repo['name'],
+                'description': descriptions[repo['html_url']],
+                'tech_stack': [repo.get('language')] if repo.get('language') else [],
+                'github_url': repo['html_url'],
+                'image_url': None
+            }
+            for repo in new_repos
+        ]
+        if rows:
+            with unit_of_work() as session:
+                session.execute(insert(Portfolio), rows)
+        
+        imported_count = len(rows)
         return jsonify({
             'message': f'Successfully imported {imported_count} projects',
-            'imported_count': imported_count
+            'imported_count': imported_count,
+            'skipped_count': len(repos) - imported_count,
+            'description_timeouts': timed_out
         }), 200
         
     except Exception as e:
@@ -233,8 +293,8 @@ def regenerate_description(project_id):
         }
         new_description = ai_service.generate_portfolio_description(project_data)
         
-        project.description = new_description
-        db.session.commit()
+        with unit_of_work():
+            project.description = new_description
         
         return jsonify({
             'message': 'Description regenerated successfully',
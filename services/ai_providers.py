@@ -0,0 +1,272 @@
+import hashlib
+import json
+import re
+import time
+from abc import ABC, abstractmethod
+from config import Config
+from services.http_client import get_session, http_timeout
+
+# What a prompt asks for. AIService passes it explicitly so providers never
+# have to guess from prompt text (which includes user code); the review
+# kinds are sent in the provider's JSON output mode.
+TEXT = 'text'
+REVIEW = 'review'
+BATCH_REVIEW = 'batch_review'
+REPAIR = 'repair'
+JSON_KINDS = frozenset((REVIEW, BATCH_REVIEW, REPAIR))
+
+
+class AIProvider(ABC):
+    """
+    Transport for one model API. Providers only send a prompt and return the
+    reply text; prompt building and reply parsing live in AIService so every
+    provider behaves the same.
+    """
+
+    name = None
+    default_model = None
+
+    def __init__(self, model=None):
+        self.model = model or self.default_model
+
+    def is_configured(self):
+        return True
+
+    @abstractmethod
+    def generate(self, prompt, read_timeout=None, kind=TEXT):
+        """
+        Return the complete reply text for prompt. For kind in JSON_KINDS
+        the provider is asked to constrain its output to a JSON object.
+        """
+
+    def start_stream(self, prompt, read_timeout=None, kind=TEXT):
+        """
+        Send prompt and return an iterator of reply text fragments. The
+        request has been made (and has failed loudly) by the time this
+        returns; fragments are read as the iterator is consumed.
+        """
+        return iter([self.generate(prompt, read_timeout, kind)])
+
+
+def _sse_data(response):
+    """Yield the payload of each `data:` line of a Server-Sent Events response"""
+    with response:
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith('data:'):
+                yield line[5:].strip()
+
+
+def _post(session, url, read_timeout, stream=False, **kwargs):
+    response = session.post(url, timeout=http_timeout(read_timeout), stream=stream, **kwargs)
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return response
+
+
+class GeminiProvider(AIProvider):
+    name = 'gemini'
+    default_model = 'gemini-2.5-flash'
+
+    def __init__(self, model, api_key, api_base, session=None):
+        super().__init__(model)
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.session = session or get_session()
+
+    def is_configured(self):
+        return bool(self.api_key) or not f'{self.api_base}/'.startswith(self.hosted_api_base)
+
+    def _url(self, method):
+        return f"{self.api_base}/models/{self.model}:{method}"
+
+    @staticmethod
+    def _body(prompt, kind):
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if kind in JSON_KINDS:
+            body["generationConfig"] = {"responseMimeType": "application/json"}
+        return body
+
+    def generate(self, prompt, read_timeout=None, kind=TEXT):
+        response = _post(
+            self.session,
+            self._url('generateContent'),
+            read_timeout,
+            params={'key': self.api_key},
+            json=self._body(prompt, kind)
+        )
+        result = response.json()
+        return result['candidates'][0]['content']['parts'][0]['text'].strip()
+
+    def start_stream(self, prompt, read_timeout=None, kind=TEXT):
+        response = _post(
+            self.session,
+            self._url('streamGenerateContent'),
+            read_timeout,
+            stream=True,
+            params={'alt': 'sse', 'key': self.api_key},
+            json=self._body(prompt, kind)
+        )
+        return self._fragments(response)
+
+    @staticmethod
+    def _fragments(response):
+        for data in _sse_data(response):
+            chunk = json.loads(data)
+            for candidate in chunk.get('candidates', [])[:1]:
+                for part in candidate.get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+
+
+class OpenAICompatibleProvider(AIProvider):
+    """
+    Any API implementing OpenAI's /chat/completions (OpenAI, Azure OpenAI
+    proxies, vLLM, Ollama, LM Studio, ...). OpenAI itself needs an API key;
+    a self-hosted server at another api_base may run without one.
+    """
+
+    name = 'openai'
+    default_model = 'gpt-4o-mini'
+    hosted_api_base = 'https://api.openai.com/'
+
+    def __init__(self, model, api_key, api_base, session=None):
+        super().__init__(model)
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.session = session or get_session()
+
+    def is_configured(self):
+        return bool(self.api_key) or not f'{self.api_base}/'.startswith(self.hosted_api_base)
+
+    def _request(self, prompt, read_timeout, stream, kind):
+        body = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'stream': stream
+        }
+        if kind in JSON_KINDS:
+            body['response_format'] = {'type': 'json_object'}
+        return _post(
+            self.session,
+            f'{self.api_base}/chat/completions',
+            read_timeout,
+            stream=stream,
+            headers={'Authorization': f'Bearer {self.api_key}'} if self.api_key else {},
+            json=body
+        )
+
+    def generate(self, prompt, read_timeout=None, kind=TEXT):
+        result = self._request(prompt, read_timeout, False, kind).json()
+        return (result['choices'][0]['message'].get('content') or '').strip()
+
+    def start_stream(self, prompt, read_timeout=None, kind=TEXT):
+        return self._fragments(self._request(prompt, read_timeout, True, kind))
+
+    @staticmethod
+    def _fragments(response):
+        for data in _sse_data(response):
+            if data == '[DONE]':
+                break
+            for choice in json.loads(data).get('choices', [])[:1]:
+                text = (choice.get('delta') or {}).get('content')
+                if text:
+                    yield text
+
+
+class StubProvider(AIProvider):
+    """
+    Offline provider for development and load tests. Replies are canned but
+    deterministic (derived from a hash of the prompt) and arrive after
+    `latency` seconds, so the full review pipeline can be exercised without
+    network access or API cost.
+    """
+
+    name = 'stub'
+    default_model = 'stub'
+
+    def __init__(self, model=None, latency=0.5, stream_chunks=8):
+        super().__init__(model)
+        self.latency = latency
+        self.stream_chunks = stream_chunks
+
+    @staticmethod
+    def _review(seed, code):
+        lines = code.splitlines()
+        long_lines = [number for number, line in enumerate(lines, 1) if len(line) > 100][:5]
+        return {
+            'quality_score': 60 + seed % 40,
+            'summary': f'Stub review of {len(lines)} lines.',
+            'issues': [
+                {'line': number, 'severity': 'low', 'message': 'Line is long; consider wrapping it'}
+                for number in long_lines
+            ],
+            'best_practices': ['Add docstrings to public functions'] if 'def ' in code else [],
+            'refactoring': [],
+            'security': ['Avoid eval()'] if 'eval(' in code else [],
+            'performance': [],
+            'testing': ['Add unit tests for the main code paths']
+        }
+
+    def _reply(self, prompt, kind):
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+
+        if kind == BATCH_REVIEW:
+            sections = re.split(r'^File (\d+) \(.*?\):\n', prompt, flags=re.M)
+            reviews = [
+                dict(self._review(seed + int(number), code), file=int(number))
+                for number, code in zip(sections[1::2], sections[2::2])
+            ]
+            return json.dumps({'reviews': reviews})
+
+        if kind == REVIEW:
+            code = prompt.split('Code:\n', 1)[-1]
+            return json.dumps(self._review(seed, code))
+
+        if kind == REPAIR:
+            return json.dumps(self._review(seed, ''))
+
+        return 'This project showcases clean, well-structured code and a thoughtful choice of technologies.'
+
+    def generate(self, prompt, read_timeout=None, kind=TEXT):
+        time.sleep(self.latency)
+        return self._reply(prompt, kind)
+
+    def start_stream(self, prompt, read_timeout=None, kind=TEXT):
+        reply = self._reply(prompt, kind)
+        size = -(-len(reply) // self.stream_chunks)
+        delay = self.latency / (self.stream_chunks + 1)
+        # The first fragment arrives after the "first token" delay
+        time.sleep(delay)
+        return self._fragments([reply[i:i + size] for i in range(0, len(reply), size)], delay)
+
+    @staticmethod
+    def _fragments(parts, delay):
+        for index, part in enumerate(parts):
+            if index:
+                time.sleep(delay)
+            yield part
+
+
+PROVIDERS = {
+    'gemini': lambda: GeminiProvider(Config.AI_MODEL, Config.GEMINI_API_KEY, Config.GEMINI_API_BASE),
+    'openai': lambda: OpenAICompatibleProvider(Config.AI_MODEL, Config.OPENAI_API_KEY, Config.OPENAI_API_BASE),
+    'stub': lambda: StubProvider(latency=Config.AI_STUB_LATENCY)
+}
+
+
+def register_provider(name, factory):
+    """
+    Register an AI provider factory. Providers subclass AIProvider and
+    implement generate() (and optionally start_stream()).
+    """
+    PROVIDERS[name] = factory
+
+
+def create_provider(name=None):
+    name = (name or Config.AI_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f'Unknown AI provider: {name}')
+    return PROVIDERS[name]()
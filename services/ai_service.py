@@ -1,19 +1,61 @@
+import contextvars
+import hashlib
 import json
-import requests
+import re
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from services.ai_providers import BATCH_REVIEW, REPAIR, REVIEW, TEXT, create_provider
+from services.analysis_executor import analysis_executor
+from services.circuit_breaker import get_breaker
+from services.single_flight import ai_flights
+from utils.cache import ai_review_cache, content_key
 from utils.code_analyzer import CodeAnalyzer
+from utils.review_schema import InvalidReview, extract_json, normalize_review
+
+REVIEW_FIELDS = (
+    'quality_score', 'summary', 'issues', 'best_practices',
+    'refactoring', 'security', 'performance', 'testing'
+)
+
+# Upstream calls made on behalf of the current review_batch, one entry per
+# call. Cache hits and single-flight joins never reach the provider.
+_provider_calls = contextvars.ContextVar('ai_provider_calls', default=None)
 
 
 class AIService:
-    def __init__(self):
-        self.model = Config.AI_MODEL
-        self.analyzer = CodeAnalyzer()
+    def __init__(self, provider=None):
+        self.provider = provider or create_provider()
+        # Cache and coalescing keys are per provider and model
+        self.model = f'{self.provider.name}:{self.provider.model}'
+        self.analyzer = analysis_executor
+        self.chunker = CodeAnalyzer()
+
+    @property
+    def available(self):
+        return self.provider.is_configured()
+
+    def _generate(self, prompt, kind=TEXT):
+        """
+        Send a prompt of the given kind (see services.ai_providers) to the
+        provider and return the reply text. Concurrent calls with the same
+        prompt (double submits, client retries) share one upstream request.
+        """
+        key = hashlib.sha256(f'{self.model}\n{kind}\n{prompt}'.encode('utf-8')).hexdigest()
+        return ai_flights.do(key, lambda: self._generate_uncoalesced(prompt, kind))
+
+    def _generate_uncoalesced(self, prompt, kind=TEXT):
+        calls = _provider_calls.get()
+        if calls is not None:
+            calls.append(kind)
+        # Fails fast with CircuitOpenError while the provider is unhealthy
+        breaker = get_breaker(f'{self.provider.name}:generate')
+        return breaker.call(lambda read_timeout: self.provider.generate(prompt, read_timeout, kind), kind)
 
     def _fallback_review(self, code, language='python'):
         analysis = self.analyzer.analyze(code, language)
         feedback = {
             'quality_score': analysis.get('quality_score', 0),
-            'summary': 'Automated static analysis summary (no OpenAI available).',
+            'summary': 'Automated static analysis summary (no AI provider available).',
             'issues': analysis.get('issues', []),
             'best_practices': [],
             'refactoring': [],
@@ -24,48 +66,327 @@ class AIService:
         return feedback
 
     def review_code(self, code, language='python'):
-        """Analyze code using Gemini AI when available, otherwise fallback to static analysis."""
-        if not Config.GEMINI_API_KEY:
+        """Review code with the configured AI provider when available, otherwise fall back to static analysis."""
+        if not self.available:
             return self._fallback_review(code, language)
 
-        prompt = f"""
-You are an expert senior software engineer and code reviewer. Analyze the following {language} code and respond as JSON with keys: quality_score, summary, issues, best_practices, refactoring, security, performance, testing.
+        # Only successful model reviews are cached, so a retry after a
+        # timeout or fallback still reaches the model.
+        cache_key = content_key(code, language.lower(), self.model)
+        cached = ai_review_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if self.estimate_tokens(code) > Config.AI_PROMPT_TOKEN_BUDGET:
+            return self._review_chunked(code, language)
+
+        try:
+            content = self._generate(self._review_prompt(code, language), REVIEW)
+            return self._parse_review(content, code, language)
+
+        except Exception as e:
+            print(f"AI provider Error: {str(e)}")
+            return self._fallback_review(code, language)
+
+    def _review_prompt(self, code, language, first_line=None):
+        excerpt = ''
+        if first_line is not None:
+            excerpt = f" This is an excerpt of a larger file; number issue lines from 1 at the first line shown (line {first_line} of the file)."
+        return f"""
+You are an expert senior software engineer and code reviewer. Analyze the following {language} code and respond as JSON with keys: quality_score (number 0-100), summary (string), issues (list of objects with line, severity and message), best_practices, refactoring, security, performance, testing (lists of strings).{excerpt}
 
 Code:
 {code}
 """
 
+    def _review_chunk(self, chunk, language):
+        first_line, code = chunk
+        content = self._generate(self._review_prompt(code, language, first_line), REVIEW)
+        return self._structured_review(content)
+
+    def _review_chunked(self, code, language):
+        """
+        Review a file too large for one prompt: split it at function/class
+        boundaries, review the chunks concurrently and merge the results,
+        so latency follows the largest chunk rather than the file size
+        """
+        chunks = self.chunker.chunk_code(code, language, Config.AI_PROMPT_TOKEN_BUDGET * 4)
+        workers = max(1, min(Config.AI_CHUNK_CONCURRENCY, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-chunk') as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._review_chunk, chunk, language)
+                for chunk in chunks
+            ]
+
+        reviews = []
+        for chunk, future in zip(chunks, futures):
+            try:
+                feedback = future.result()
+            except Exception as e:
+                print(f"AI provider Error: {str(e)}")
+                continue
+            reviews.append((chunk, feedback))
+
+        if not reviews:
+            return self._fallback_review(code, language)
+
+        feedback = self._merge_chunk_reviews(reviews, len(chunks))
+        # Only cache a review that covers the whole file
+        if len(reviews) == len(chunks):
+            ai_review_cache.set(content_key(code, language.lower(), self.model), feedback)
+        return feedback
+
+    @staticmethod
+    def _merge_chunk_reviews(reviews, total_chunks):
+        """
+        Combine per-chunk feedback: quality score weighted by chunk size,
+        issue lines shifted to file line numbers, other lists deduplicated
+        """
+        weights = [len(code) for (_, code), _ in reviews]
+        quality_score = round(
+            sum(feedback['quality_score'] * weight for (_, feedback), weight in zip(reviews, weights)) / sum(weights), 2
+        )
+
+        issues = []
+        for (first_line, _), feedback in reviews:
+            for issue in feedback['issues']:
+                if issue['line'] is not None:
+                    issue = dict(issue, line=issue['line'] + first_line - 1)
+                issues.append(issue)
+
+        merged = {
+            'quality_score': quality_score,
+            'summary': ' '.join(feedback['summary'] for _, feedback in reviews if feedback['summary']),
+            'issues': issues
+        }
+        if len(reviews) < total_chunks:
+            merged['summary'] += f' (AI review covers {len(reviews)} of {total_chunks} parts of this file.)'
+
+        for field in ('best_practices', 'refactoring', 'security', 'performance', 'testing'):
+            seen = set()
+            merged[field] = []
+            for _, feedback in reviews:
+                for item in feedback[field]:
+                    marker = item.lower()
+                    if marker not in seen:
+                        seen.add(marker)
+                        merged[field].append(item)
+        return merged
+
+    @staticmethod
+    def _repair_prompt(content):
+        return f"""
+The text below was meant to be a JSON code review object with keys quality_score (number 0-100), summary (string), issues (list of objects with line, severity and message), best_practices, refactoring, security, performance, testing (lists of strings). Return only that JSON object, corrected, with no other text.
+
+Text:
+{content}
+"""
+
+    def _structured_review(self, content):
+        """
+        Extract and validate the review in a model reply. Only a reply that
+        cannot be read costs a second call: the model is asked once to
+        repair it, and InvalidReview is raised if that fails too.
+        """
+        try:
+            return normalize_review(extract_json(content))
+        except InvalidReview as e:
+            print(f"AI review parse Error: {str(e)}; requesting repair")
+        repaired = self._generate(self._repair_prompt(content), REPAIR)
+        return normalize_review(extract_json(repaired))
+
+    def _parse_review(self, content, code, language):
+        """Turn the model's reply into feedback, caching it when it is a valid review"""
+        if not content:
+            return self._fallback_review(code, language)
+
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={Config.GEMINI_API_KEY}"
-            headers = {'Content-Type': 'application/json'}
-            data = {
-                "contents": [{"parts": [{"text": prompt}]}]
-            }
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            content = result['candidates'][0]['content']['parts'][0]['text'].strip()
-            
-            if not content:
-                return self._fallback_review(code, language)
+            feedback = self._structured_review(content)
+        except Exception as e:
+            print(f"AI provider Error: {str(e)}")
+            # Keep the model's prose, but score with static analysis and
+            # leave it uncached so the next request asks the model again
+            feedback = self._fallback_review(code, language)
+            feedback['summary'] = content
+            return feedback
+
+        ai_review_cache.set(content_key(code, language.lower(), self.model), feedback)
+        return feedback
 
+    def _stream_generate(self, prompt, kind=TEXT):
+        """Yield reply text fragments from the provider as they arrive"""
+        # The breaker measures time to first byte; the read timeout then
+        # applies to each gap between streamed chunks
+        breaker = get_breaker(f'{self.provider.name}:stream')
+        return breaker.call_stream(lambda read_timeout: self.provider.start_stream(prompt, read_timeout, kind), kind)
+
+    @staticmethod
+    def _completed_fields(text, found):
+        """
+        Top-level review fields whose JSON value is already complete in the
+        partial reply text and not yet in found
+        """
+        decoder = json.JSONDecoder()
+        fields = {}
+        for name in REVIEW_FIELDS:
+            if name in found:
+                continue
+            match = re.search(r'"%s"\s*:\s*' % name, text)
+            if match is None:
+                continue
             try:
-                return json.loads(content)
+                value, end = decoder.raw_decode(text, match.end())
             except json.JSONDecodeError:
-                return {
-                    'quality_score': 70,
-                    'summary': content,
-                    'issues': [],
-                    'best_practices': [],
-                    'refactoring': [],
-                    'security': [],
-                    'performance': [],
-                    'testing': []
-                }
+                continue
+            # A number at the very end of the text may still be growing
+            if end < len(text):
+                fields[name] = value
+        return fields
+
+    def stream_review(self, code, language='python'):
+        """
+        Review code through the streaming endpoint. Yields ('delta', text)
+        for each fragment, ('field', {name: value}) as top-level fields
+        complete, and finally ('feedback', feedback dict).
+        """
+        cached = ai_review_cache.get(content_key(code, language.lower(), self.model)) if self.available else None
+        if not self.available or cached is not None:
+            yield 'feedback', cached if cached is not None else self._fallback_review(code, language)
+            return
 
+        if self.estimate_tokens(code) > Config.AI_PROMPT_TOKEN_BUDGET:
+            # Chunked reviews run concurrently and are returned whole
+            yield 'feedback', self.review_code(code, language)
+            return
+
+        text = ''
+        found = {}
+        try:
+            for fragment in self._stream_generate(self._review_prompt(code, language), REVIEW):
+                text += fragment
+                yield 'delta', fragment
+                fields = self._completed_fields(text, found)
+                if fields:
+                    found.update(fields)
+                    yield 'field', fields
         except Exception as e:
-            print(f"Gemini API Error: {str(e)}")
-            return self._fallback_review(code, language)
+            print(f"AI provider Error: {str(e)}")
+            yield 'feedback', self._fallback_review(code, language)
+            return
+
+        yield 'feedback', self._parse_review(text.strip(), code, language)
+
+    @staticmethod
+    def estimate_tokens(text):
+        """Rough token count (about 4 characters per token)"""
+        return len(text) // 4 + 1
+
+    def _pack_files(self, files, budget):
+        """
+        Group file indexes so each group's code fits in one prompt of about
+        budget tokens; a file larger than the budget gets a group of its own
+        """
+        groups = []
+        current, used = [], 0
+        for index, item in sorted(enumerate(files), key=lambda pair: len(pair[1]['code'])):
+            tokens = self.estimate_tokens(item['code'])
+            if current and used + tokens > budget:
+                groups.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _review_group(self, files, indexes):
+        """Review several files with one prompt; returns {index: feedback}"""
+        if len(indexes) == 1:
+            item = files[indexes[0]]
+            return {indexes[0]: self.review_code(item['code'], item['language'])}
+
+        sections = '\n\n'.join(
+            f"File {index} ({files[index]['name']}, {files[index]['language']}):\n{files[index]['code']}"
+            for index in indexes
+        )
+        prompt = f"""
+You are an expert senior software engineer and code reviewer. Review each of the following files independently and respond as JSON of the form {{"reviews": [{{"file": <file number>, "quality_score": ..., "summary": ..., "issues": ..., "best_practices": ..., "refactoring": ..., "security": ..., "performance": ..., "testing": ...}}]}} with exactly one entry per file.
+
+{sections}
+"""
+
+        reviews = {}
+        try:
+            content = self._generate(prompt, BATCH_REVIEW)
+            for entry in extract_json(content).get('reviews') or []:
+                try:
+                    index = int(entry.get('file'))
+                    if index in indexes:
+                        reviews[index] = normalize_review(entry)
+                except (AttributeError, TypeError, ValueError):
+                    # Unreadable entries fall back per file below
+                    continue
+        except Exception as e:
+            print(f"AI provider Error: {str(e)}")
+
+        for index in indexes:
+            item = files[index]
+            if index in reviews:
+                ai_review_cache.set(content_key(item['code'], item['language'].lower(), self.model), reviews[index])
+            else:
+                reviews[index] = self._fallback_review(item['code'], item['language'])
+        return reviews
+
+    def review_batch(self, files):
+        """
+        Review [{'name', 'code', 'language'}, ...], packing small files into
+        shared prompts within AI_BATCH_TOKEN_BUDGET. Returns (feedback list
+        in input order, number of AI provider calls made).
+        """
+        if not self.available:
+            return [self._fallback_review(item['code'], item['language']) for item in files], 0
+
+        calls = []
+        token = _provider_calls.set(calls)
+        try:
+            return self._review_batch(files), len(calls)
+        finally:
+            _provider_calls.reset(token)
+
+    def _review_batch(self, files):
+
+        feedback = {}
+        pending = []
+        for index, item in enumerate(files):
+            cached = ai_review_cache.get(content_key(item['code'], item['language'].lower(), self.model))
+            if cached is not None:
+                feedback[index] = cached
+            else:
+                pending.append(index)
+
+        groups = [
+            [pending[i] for i in group]
+            for group in self._pack_files([files[index] for index in pending], Config.AI_BATCH_TOKEN_BUDGET)
+        ]
+        if groups:
+            workers = max(1, min(Config.AI_BATCH_CONCURRENCY, len(groups)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai-batch') as executor:
+                # Each job runs in a copy of this context so its calls are counted
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._review_group, files, group)
+                    for group in groups
+                ]
+                for future in futures:
+                    feedback.update(future.result())
+
+        return [feedback[index] for index in range(len(files))]
+
+    def basic_portfolio_description(self, project_data):
+        """One-line description used when the AI is unavailable"""
+        tech_stack = project_data.get('tech_stack', 'Not specified')
+        if isinstance(tech_stack, list):
+            tech_stack = ', '.join(tech_stack)
+        return f"{project_data.get('name', 'Project')} built with {tech_stack}."
 
     def generate_portfolio_description(self, project_data):
         tech_stack = project_data.get('tech_stack', 'Not specified')
@@ -75,8 +396,8 @@ Code:
         if isinstance(features, list):
             features = ', '.join(features)
 
-        if not Config.GEMINI_API_KEY:
-            return f"{project_data.get('name', 'Project')} built with {tech_stack}."
+        if not self.available:
+            return self.basic_portfolio_description(project_data)
 
         prompt = f"""Create a comprehensive and professional portfolio description (4-5 sentences) for this software project:
 
@@ -94,35 +415,19 @@ The description should:
 Write in a compelling, professional tone that showcases technical expertise."""
         
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={Config.GEMINI_API_KEY}"
-            headers = {'Content-Type': 'application/json'}
-            data = {
-                "contents": [{"parts": [{"text": prompt}]}]
-            }
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text'].strip()
+            return self._generate(prompt)
         except Exception as e:
-            print(f"Gemini API Error: {str(e)}")
-            return f"{project_data.get('name', 'Project')} built with {tech_stack}."
+            print(f"AI provider Error: {str(e)}")
+            return self.basic_portfolio_description(project_data)
 
     def suggest_improvements(self, code, language='python'):
-        if not Config.GEMINI_API_KEY:
+        if not self.available:
             analysis = self.analyzer.analyze(code, language)
             return f"Static analysis: {analysis.get('issues_count',0)} issues, quality {analysis.get('quality_score')}"
 
         prompt = f"Review this {language} code and provide 3 specific improvements:\n\n{code}\n"
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={Config.GEMINI_API_KEY}"
-            headers = {'Content-Type': 'application/json'}
-            data = {
-                "contents": [{"parts": [{"text": prompt}]}]
-            }
-            response = requests.post(url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            return result['candidates'][0]['content']['parts'][0]['text'].strip()
+            return self._generate(prompt)
         except Exception as e:
-            print(f"Gemini API Error: {str(e)}")
+            print(f"AI provider Error: {str(e)}")
             return f"Error generating suggestions: {str(e)}"
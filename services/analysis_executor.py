@@ -0,0 +1,179 @@
+import multiprocessing
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from utils.cache import analysis_cache, normalize_code
+from utils.code_analyzer import CodeAnalyzer
+
+_worker_analyzer = None
+
+
+class AnalysisTimeout(Exception):
+    """Raised when static analysis does not finish within the job timeout"""
+
+
+class AnalysisInputTooLarge(ValueError):
+    """Raised when submitted code exceeds the analysis size limit"""
+
+
+def _warm_worker():
+    """Process initializer: import radon and build the analyzer up front"""
+    global _worker_analyzer
+    _worker_analyzer = CodeAnalyzer()
+
+
+def _run_analysis(code, language):
+    return _worker_analyzer.compute(code, language)
+
+
+class AnalysisExecutor:
+    """
+    Runs CodeAnalyzer in a pool of worker processes so CPU-bound analysis
+    neither blocks the request thread's GIL nor is capped at one core per
+    web process. Results are cached in the parent, so only misses reach a
+    worker. The pool is replaced after max_jobs_per_worker jobs per worker
+    (bounding memory growth in long-lived workers) and whenever a running
+    job times out (so a runaway analysis does not hold a worker forever).
+    At most one job per worker is in flight, so the timeout measures how
+    long a job ran rather than how long it queued behind other requests.
+    """
+
+    def __init__(self, workers=2, timeout=10, max_input_bytes=512 * 1024, max_jobs_per_worker=500):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_input_bytes = max_input_bytes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.analyzer = CodeAnalyzer()
+        self._pool = None
+        self._jobs = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(workers, 1))
+        self._counters = {'jobs': 0, 'cache_hits': 0, 'timeouts': 0, 'recycles': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _new_pool(self):
+        methods = multiprocessing.get_all_start_methods()
+        # Never fork the threaded web process; forkserver children start clean
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if context.get_start_method() == 'forkserver':
+            context.set_forkserver_preload(['utils.code_analyzer'])
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_warm_worker)
+
+    def _acquire_pool(self):
+        with self._lock:
+            if self._pool is not None and self._jobs >= self.workers * self.max_jobs_per_worker:
+                self._retire(self._pool, terminate=False)
+                self._pool = None
+            if self._pool is None:
+                self._pool = self._new_pool()
+                self._jobs = 0
+            self._jobs += 1
+            return self._pool
+
+    def _retire(self, pool, terminate):
+        self._counters['recycles'] += 1
+        # Jobs other requests already queued on this pool still run (or,
+        # once its workers are terminated, fail and are resubmitted)
+        pool.shutdown(wait=False, cancel_futures=False)
+        if terminate:
+            # ProcessPoolExecutor cannot cancel a running job; stop its workers
+            for process in list((getattr(pool, '_processes', None) or {}).values()):
+                process.terminate()
+
+    def _discard(self, pool, terminate):
+        with self._lock:
+            if self._pool is pool:
+                self._retire(pool, terminate)
+                self._pool = None
+
+    def check_size(self, code):
+        if len(code.encode('utf-8')) > self.max_input_bytes:
+            raise AnalysisInputTooLarge(
+                f'Code is too large to analyze (limit {self.max_input_bytes // 1024} KB)'
+            )
+
+    def analyze(self, code, language='python'):
+        """
+        Drop-in replacement for CodeAnalyzer.analyze. Raises
+        AnalysisInputTooLarge or AnalysisTimeout.
+        """
+        code = normalize_code(code)
+        self.check_size(code)
+
+        cache_key = self.analyzer.cache_key(code, language)
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached
+
+        self._count('jobs')
+        if self.workers <= 0:
+            result = self.analyzer.compute(code, language)
+        else:
+            result = self._submit(code, language)
+
+        analysis_cache.set(cache_key, result)
+        return result
+
+    def analyze_many(self, files):
+        """
+        Analyze [(code, language), ...] concurrently across the worker pool,
+        returning results in the same order. Each job keeps its own timeout.
+        """
+        if len(files) <= 1 or self.workers <= 1:
+            return [self.analyze(code, language) for code, language in files]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(files)), thread_name_prefix='analysis') as threads:
+            return list(threads.map(lambda item: self.analyze(*item), files))
+
+    def _submit(self, code, language):
+        # Wait for a free worker before starting the job's clock
+        with self._slots:
+            return self._run(code, language)
+
+    def _run(self, code, language, retry=True):
+        pool = self._acquire_pool()
+        try:
+            future = pool.submit(_run_analysis, code, language)
+            return future.result(timeout=self.timeout)
+        except FuturesTimeout:
+            self._count('timeouts')
+            # A job that never started (e.g. a pool slow to spawn) is only
+            # dropped; terminating would kill other requests' running jobs
+            if not future.cancel():
+                self._discard(pool, terminate=True)
+            raise AnalysisTimeout(f'Analysis did not finish within {self.timeout:g}s')
+        except (RuntimeError, CancelledError) as e:
+            # BrokenProcessPool (a worker died, e.g. terminated after another
+            # job's timeout), a submit racing a recycle or a job cancelled
+            # with its pool: retry on a fresh pool
+            if isinstance(e, RuntimeError) and not isinstance(e, BrokenProcessPool) and 'shutdown' not in str(e):
+                raise
+            self._discard(pool, terminate=False)
+            if not retry:
+                raise
+            return self._run(code, language, retry=False)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters['workers'] = self.workers
+        return counters
+
+
+analysis_executor = AnalysisExecutor(
+    workers=Config.ANALYSIS_WORKERS,
+    timeout=Config.ANALYSIS_TIMEOUT,
+    max_input_bytes=Config.ANALYSIS_MAX_INPUT_BYTES,
+    max_jobs_per_worker=Config.ANALYSIS_MAX_JOBS_PER_WORKER
+)
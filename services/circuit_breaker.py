@@ -0,0 +1,208 @@
+import threading
+import time
+from collections import deque
+import requests
+from config import Config
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with an adaptive read timeout for one
+    upstream endpoint.
+
+    The outcomes of the last `window` calls are kept; once at least
+    `min_calls` are recorded and the failure rate reaches `failure_rate`,
+    the circuit opens and calls fail immediately for `open_seconds`. It
+    then half-opens and lets a single probe through: success closes it,
+    failure opens it again.
+
+    Latencies of calls that return are sampled too, in a separate window
+    per kind of call (a short text prompt and a full review are not
+    comparable). The timeout offered to the next call of a kind is that
+    kind's latency percentile times `timeout_multiplier`, clamped to
+    [min_timeout, max_timeout], so a slow-but-healthy endpoint keeps its
+    headroom while a hung one is abandoned early.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=20, min_calls=5, failure_rate=0.5, open_seconds=30,
+                 min_timeout=5, max_timeout=30, timeout_percentile=0.99, timeout_multiplier=2,
+                 latency_samples=100):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self.latency_samples = latency_samples
+        self._latencies = {}
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def allow(self):
+        """Reserve a call, or raise CircuitOpenError"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self._counters['rejected'] += 1
+                    raise CircuitOpenError(f'{self.name} circuit is open')
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._counters['rejected'] += 1
+                    raise CircuitOpenError(f'{self.name} circuit is half-open')
+                self._probe_in_flight = True
+
+            self._counters['calls'] += 1
+
+    def timeout(self, kind=None):
+        """Read timeout for the next call of the given kind"""
+        with self._lock:
+            latencies = sorted(self._latencies.get(kind, ()))
+        if len(latencies) < self.min_calls:
+            return self.max_timeout
+        index = min(len(latencies) - 1, int(len(latencies) * self.timeout_percentile))
+        return max(self.min_timeout, min(self.max_timeout, latencies[index] * self.timeout_multiplier))
+
+    def record_success(self, latency=None, kind=None):
+        """Record a healthy outcome, sampling latency if the call returned"""
+        with self._lock:
+            if latency is not None:
+                samples = self._latencies.get(kind)
+                if samples is None:
+                    samples = self._latencies[kind] = deque(maxlen=self.latency_samples)
+                samples.append(latency)
+            self._outcomes.append(True)
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._counters['failures'] += 1
+            self._outcomes.append(False)
+            self._probe_in_flight = False
+
+            failures = self._outcomes.count(False)
+            if self.state == self.HALF_OPEN or (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                if self.state != self.OPEN:
+                    self._counters['opened'] += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    @staticmethod
+    def is_failure(error):
+        """Client errors (4xx other than 429) say nothing about upstream health"""
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status == 429 or status >= 500
+        return True
+
+    def call(self, func, kind=None):
+        """
+        Run func(timeout) through the breaker, recording its outcome. The
+        timeout and latency sample use the window for `kind`.
+        """
+        self.allow()
+        started = time.monotonic()
+        try:
+            result = func(self.timeout(kind))
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                # A fast client error is no measure of how long a reply takes
+                self.record_success()
+            raise
+        self.record_success(time.monotonic() - started, kind)
+        return result
+
+    def call_stream(self, start, kind=None):
+        """
+        Like call() for a streamed reply: start(timeout) returns an iterator
+        of fragments, which this generator passes through. The latency
+        sample is the time start() took (time to first byte); the outcome
+        is recorded when the stream ends, so a read error or timeout
+        mid-stream counts as a failure.
+        """
+        self.allow()
+        started = time.monotonic()
+        try:
+            fragments = start(self.timeout(kind))
+            latency = time.monotonic() - started
+            yield from fragments
+        except GeneratorExit:
+            # The consumer stopped reading; the upstream was healthy so far
+            self.record_success()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success(latency, kind)
+
+    def stats(self):
+        with self._lock:
+            kinds = list(self._latencies)
+        timeouts = {kind or 'default': round(self.timeout(kind), 2) for kind in kinds}
+        with self._lock:
+            counters = dict(self._counters)
+            counters.update({
+                'state': self.state,
+                'window_failure_rate': round(self._outcomes.count(False) / len(self._outcomes), 4) if self._outcomes else 0,
+                'timeouts': timeouts
+            })
+        return counters
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """
+    Return the process-wide breaker for an upstream endpoint, creating it
+    from the AI_BREAKER_* settings on first use
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                window=Config.AI_BREAKER_WINDOW,
+                min_calls=Config.AI_BREAKER_MIN_CALLS,
+                failure_rate=Config.AI_BREAKER_FAILURE_RATE,
+                open_seconds=Config.AI_BREAKER_OPEN_SECONDS,
+                min_timeout=Config.AI_TIMEOUT_MIN,
+                max_timeout=Config.HTTP_READ_TIMEOUT,
+                timeout_percentile=Config.AI_TIMEOUT_PERCENTILE,
+                timeout_multiplier=Config.AI_TIMEOUT_MULTIPLIER
+            )
+        return breaker
+
+
+def breaker_stats():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -1,10 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlencode
 import requests
 from config import Config
+from services.http_client import get_session, http_timeout
+from utils.cache import github_cache
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when the GitHub rate limit is exhausted and no cached copy exists"""
+
+
+class RateLimitTracker:
+    """
+    Tracks the X-RateLimit-* budget reported by GitHub along with response
+    cache counters, shared by every GitHubService in the process
+    """
+
+    def __init__(self, reserve=10):
+        self.reserve = reserve
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self._lock = threading.Lock()
+        self._counters = {
+            'requests': 0,
+            'not_modified': 0,
+            'stale_served': 0,
+            'fetched': 0
+        }
+
+    def update(self, headers):
+        with self._lock:
+            if 'X-RateLimit-Remaining' in headers:
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                self.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Reset' in headers:
+                self.reset_at = int(headers['X-RateLimit-Reset'])
+
+    def _window_open(self):
+        return self.reset_at is not None and self.reset_at > time.time()
+
+    def is_low(self):
+        """True when the remaining budget is at or below the reserve"""
+        with self._lock:
+            return self.remaining is not None and self.remaining <= self.reserve and self._window_open()
+
+    def is_exhausted(self):
+        with self._lock:
+            return self.remaining is not None and self.remaining <= 0 and self._window_open()
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters.update({
+                'rate_limit': self.limit,
+                'rate_limit_remaining': self.remaining,
+                'rate_limit_reset': self.reset_at
+            })
+
+        cached = counters['not_modified'] + counters['stale_served']
+        lookups = cached + counters['fetched']
+        counters['cache_hit_ratio'] = round(cached / lookups, 4) if lookups else 0
+        return counters
+
+
+rate_limit = RateLimitTracker(reserve=Config.GITHUB_RATE_LIMIT_RESERVE)
 
 
 class GitHubService:
     def __init__(self):
         self.base_url = Config.GITHUB_API_URL
+        self.session = get_session()
         self.headers = {
             'Accept': 'application/vnd.github.v3+json'
         }
@@ -13,40 +87,121 @@ class GitHubService:
         if Config.GITHUB_CLIENT_ID and Config.GITHUB_CLIENT_SECRET:
             self.headers['Authorization'] = f'token {Config.GITHUB_CLIENT_SECRET}'
 
-    def get_user_repositories(self, username, per_page=30):
+    def _fetch(self, url, params=None):
         """
-        Fetch public repositories for a given GitHub username
+        Conditional GET against the GitHub API.
+
+        Responses are cached with their ETag/Last-Modified validators and
+        revalidated with If-None-Match/If-Modified-Since, so unchanged
+        resources come back as a 304 that does not count against the rate
+        limit. When the remaining budget is low, cached data is served
+        without contacting GitHub.
         """
+        cache_key = f'{url}?{urlencode(sorted((params or {}).items()))}'
+        cached = github_cache.get(cache_key)
+
+        if cached is not None and rate_limit.is_low():
+            rate_limit.count('stale_served')
+            return cached
+        if rate_limit.is_exhausted():
+            raise RateLimitExceeded('GitHub API rate limit exhausted')
+
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        rate_limit.count('requests')
+        response = self.session.get(url, headers=headers, params=params, timeout=http_timeout())
+        rate_limit.update(response.headers)
+
+        if cached is not None:
+            if response.status_code == 304:
+                rate_limit.count('not_modified')
+                return cached
+            if response.status_code in (403, 429) and rate_limit.is_exhausted():
+                rate_limit.count('stale_served')
+                return cached
+
+        response.raise_for_status()
+        rate_limit.count('fetched')
+
+        entry = {
+            'body': response.json(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'next_url': response.links.get('next', {}).get('url')
+        }
+        if entry['etag'] or entry['last_modified']:
+            github_cache.set(cache_key, entry)
+        return entry
+
+    def _get_json(self, url, params=None):
+        return self._fetch(url, params)['body']
+
+    @staticmethod
+    def _repo_summary(repo):
+        return {
+            'name': repo.get('name'),
+            'description': repo.get('description'),
+            'html_url': repo.get('html_url'),
+            'language': repo.get('language'),
+            'stars': repo.get('stargazers_count'),
+            'forks': repo.get('forks_count'),
+            'updated_at': repo.get('updated_at'),
+            'topics': repo.get('topics', [])
+        }
+
+    def iter_user_repositories(self, username, per_page=100, include_forks=False, prefetch=True):
+        """
+        Lazily yield public repositories for a GitHub username, following the
+        Link rel="next" header across pages. Stopping iteration early skips
+        the remaining pages; with prefetch the next page is fetched in the
+        background while the current one is consumed.
+        """
+        url = f'{self.base_url}/users/{username}/repos'
+        params = {
+            'sort': 'updated',
+            'per_page': per_page,
+            'type': 'owner'
+        }
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='github-prefetch') if prefetch else None
         try:
-            url = f'{self.base_url}/users/{username}/repos'
-            params = {
-                'sort': 'updated',
-                'per_page': per_page,
-                'type': 'owner'
-            }
+            page = self._fetch(url, params)
+            while True:
+                next_url = page.get('next_url')
+                upcoming = executor.submit(self._fetch, next_url) if executor and next_url else None
+
+                for repo in page['body']:
+                    if include_forks or not repo.get('fork', False):
+                        yield self._repo_summary(repo)
+
+                if not next_url:
+                    break
+                page = upcoming.result() if upcoming else self._fetch(next_url)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
 
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-
-            repos = response.json()
-
-            # Extract relevant information
-            return [
-                {
-                    'name': repo.get('name'),
-                    'description': repo.get('description'),
-                    'html_url': repo.get('html_url'),
-                    'language': repo.get('language'),
-                    'stars': repo.get('stargazers_count'),
-                    'forks': repo.get('forks_count'),
-                    'updated_at': repo.get('updated_at'),
-                    'topics': repo.get('topics', [])
-                }
-                for repo in repos if not repo.get('fork', False)
-            ]
+    def get_user_repositories(self, username, per_page=100, limit=None):
+        """
+        Fetch public repositories for a given GitHub username. If a later
+        page fails, the repositories already fetched are returned.
+        """
+        # A limit that fits in the first page usually needs no second page,
+        # so do not spend rate limit fetching it ahead
+        prefetch = limit is None or limit > per_page
+        repos = []
+        try:
+            repos.extend(islice(self.iter_user_repositories(username, per_page=per_page, prefetch=prefetch), limit))
 
         except requests.exceptions.RequestException:
-            return []
+            pass
+
+        return repos
 
     def get_repository_details(self, owner, repo):
         """
@@ -54,10 +209,7 @@ class GitHubService:
         """
         try:
             url = f'{self.base_url}/repos/{owner}/{repo}'
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(url)
 
             return {
                 'name': data.get('name'),
@@ -82,10 +234,7 @@ class GitHubService:
         """
         try:
             url = f'{self.base_url}/users/{username}'
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            data = response.json()
+            data = self._get_json(url)
 
             return {
                 'username': data.get('login'),
@@ -110,10 +259,7 @@ class GitHubService:
         """
         try:
             url = f'{self.base_url}/repos/{owner}/{repo}/languages'
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-
-            return response.json()
+            return self._get_json(url)
 
         except requests.exceptions.RequestException:
             return {}
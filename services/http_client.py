@@ -0,0 +1,60 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_connections=None, pool_maxsize=None, max_retries=None, backoff_factor=None):
+    """
+    Create a requests.Session with a keep-alive connection pool per host and
+    retries with exponential backoff. Only idempotent methods are retried on
+    read errors and retryable status codes; any method is retried when the
+    connection could not be established.
+    """
+    pool_connections = pool_connections or Config.HTTP_POOL_CONNECTIONS
+    pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+    max_retries = Config.HTTP_MAX_RETRIES if max_retries is None else max_retries
+    backoff_factor = Config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """
+    Return the process-wide pooled session shared by the outbound services
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def http_timeout(read_timeout=None):
+    """
+    (connect, read) timeout tuple for outbound requests
+    """
+    return (Config.HTTP_CONNECT_TIMEOUT, read_timeout or Config.HTTP_READ_TIMEOUT)
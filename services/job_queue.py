@@ -0,0 +1,87 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import Config
+
+
+class QueueFullError(Exception):
+    """Raised when a job queue has no capacity left for new work"""
+
+
+class ThreadPoolJobQueue:
+    """
+    In-process bounded worker pool. At most max_pending jobs may be queued or
+    running at once; further enqueues are rejected instead of piling up.
+    """
+
+    def __init__(self, max_workers=4, max_pending=100):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='review-job')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def enqueue(self, func, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError('Review queue is full, please retry shortly')
+
+        with self._lock:
+            self._pending += 1
+
+        future = self._executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {
+            'backend': 'thread',
+            'workers': self.max_workers,
+            'pending': pending,
+            'max_pending': self.max_pending
+        }
+
+
+class InlineJobQueue:
+    """
+    Runs jobs synchronously in the calling thread (useful for debugging and
+    single-process scripts)
+    """
+
+    def enqueue(self, func, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def stats(self):
+        return {'backend': 'inline', 'pending': 0}
+
+
+QUEUE_BACKENDS = {
+    'thread': lambda: ThreadPoolJobQueue(Config.REVIEW_WORKERS, Config.REVIEW_QUEUE_MAX_PENDING),
+    'inline': InlineJobQueue
+}
+
+
+def register_queue_backend(name, factory):
+    """
+    Register a queue backend factory (e.g. one backed by RQ or Celery).
+    Backends must provide enqueue(func, *args, **kwargs) and stats().
+    """
+    QUEUE_BACKENDS[name] = factory
+
+
+def create_job_queue(backend=None):
+    backend = backend or Config.REVIEW_QUEUE_BACKEND
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError(f'Unknown review queue backend: {backend}')
+    return QUEUE_BACKENDS[backend]()
@@ -0,0 +1,265 @@
+import json
+import queue
+import threading
+import time
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from config import Config
+from models.notification import Notification
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+REDIS_CHANNEL = 'codesage:notifications'
+RECONNECT_DELAY_MAX = 30
+
+
+class TooManyConnections(Exception):
+    """Raised when a user already has the maximum number of open streams"""
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue of events for a single user.
+    Once an event has been dropped the subscription is lost: its stream
+    must end so the client reconnects and replays from the last event id
+    it received (sending later events would move that id past the gap).
+    """
+
+    def __init__(self, user_id, max_events=100):
+        self.user_id = user_id
+        self.events = queue.Queue(maxsize=max_events)
+        self.lost = False
+
+    def push(self, payload):
+        if self.lost:
+            return
+        try:
+            self.events.put_nowait(payload)
+        except queue.Full:
+            # Slow client
+            self.close()
+
+    def close(self):
+        """Mark the subscription lost and wake its stream"""
+        self.lost = True
+        try:
+            self.events.put_nowait(None)
+        except queue.Full:
+            # The stream checks lost after its next get()
+            pass
+
+    def get(self, timeout):
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class NotificationBus:
+    """
+    In-process pub/sub for notification events. With a Redis URL, events
+    are published to a Redis channel and every process relays them to its
+    own subscribers, so clients connected to any worker receive them.
+
+    max_connections_per_user is enforced per process: with several
+    gunicorn workers a user can hold that many streams in each worker.
+    """
+
+    def __init__(self, max_connections_per_user=3, redis_url=None):
+        self.max_connections_per_user = max_connections_per_user
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._listener_redis = None
+        self._listener = None
+
+        if redis_url and redis is not None:
+            # publish() runs in the committing request thread: fail fast
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            # The subscriber blocks waiting for messages, so only its
+            # connect is bounded; keepalive detects a dead connection
+            self._listener_redis = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_keepalive=True)
+
+    def subscribe(self, user_id):
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(user_id, set())
+            if len(subscriptions) >= self.max_connections_per_user:
+                raise TooManyConnections('Too many open notification streams')
+            subscription = Subscription(user_id)
+            subscriptions.add(subscription)
+
+        self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, payload):
+        """
+        Deliver payload ({'event': ..., 'id': ..., 'data': ...}) to the
+        user's open streams in every process
+        """
+        if self._redis is not None:
+            try:
+                self._redis.publish(REDIS_CHANNEL, json.dumps({'user_id': user_id, 'payload': payload}))
+                return
+            except Exception as e:
+                print(f"Notification bus Redis Error: {str(e)}")
+
+        self._dispatch(user_id, payload)
+
+    def _close_all(self):
+        with self._lock:
+            subscriptions = [subscription for group in self._subscribers.values() for subscription in group]
+        for subscription in subscriptions:
+            subscription.close()
+
+    def _dispatch(self, user_id, payload):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.push(payload)
+
+    def _ensure_listener(self):
+        if self._redis is None or self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='notification-bus', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        # Runs for the life of the process: a lost Redis connection is
+        # re-established with exponential backoff. Events published while
+        # disconnected are missed, so every open stream is closed, both when
+        # the connection drops and once it is back (streams opened during
+        # the outage missed events too); clients replay via Last-Event-ID.
+        delay = 1
+        reconnecting = False
+        while True:
+            pubsub = self._listener_redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(REDIS_CHANNEL)
+                if reconnecting:
+                    self._close_all()
+                    reconnecting = False
+                delay = 1
+                for message in pubsub.listen():
+                    try:
+                        data = json.loads(message['data'])
+                        self._dispatch(data['user_id'], data['payload'])
+                    except Exception as e:
+                        print(f"Notification bus Redis Error: {str(e)}")
+            except Exception as e:
+                print(f"Notification bus Redis Error: {str(e)}; reconnecting in {delay}s")
+                if not reconnecting:
+                    self._close_all()
+                    reconnecting = True
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_DELAY_MAX)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+
+notification_bus = NotificationBus(
+    max_connections_per_user=Config.SSE_MAX_CONNECTIONS_PER_USER,
+    redis_url=Config.REDIS_URL
+)
+
+# Callbacks run after each commit with
+# {user_id: {'created': [(event_seq, notification dict)], 'updated': [(event_seq, notification dict)], 'unread_delta': n}}
+commit_listeners = []
+
+
+def _pending_changes(session):
+    return session.info.setdefault('notification_changes', {})
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_notification_changes(session, flush_context):
+    changes = _pending_changes(session)
+
+    def entry(user_id):
+        return changes.setdefault(user_id, {'created': [], 'updated': [], 'unread_delta': 0})
+
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            # Serialize now: after the commit the instance is expired and
+            # the session can no longer load it
+            entry(obj.user_id)['created'].append((obj.event_seq, obj.to_dict()))
+            if not obj.read:
+                entry(obj.user_id)['unread_delta'] += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Notification):
+            state = inspect(obj).attrs
+            history = state.read.history
+            if history.has_changes():
+                was_read = bool(history.deleted[0]) if history.deleted else False
+                if was_read != bool(obj.read):
+                    entry(obj.user_id)['unread_delta'] += -1 if obj.read else 1
+            if state.event_seq.history.has_changes():
+                entry(obj.user_id)['updated'].append((obj.event_seq, obj.to_dict()))
+
+    for obj in session.deleted:
+        if isinstance(obj, Notification) and not obj.read:
+            entry(obj.user_id)['unread_delta'] -= 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_notification_changes(session):
+    changes = session.info.pop('notification_changes', None)
+    if not changes:
+        return
+
+    for user_id, change in changes.items():
+        for event_seq, notification in change['created']:
+            notification_bus.publish(user_id, {
+                'event': 'notification',
+                'id': event_seq,
+                'data': notification
+            })
+        for event_seq, notification in change['updated']:
+            notification_bus.publish(user_id, {
+                'event': 'notification_updated',
+                'id': event_seq,
+                'data': notification
+            })
+        if change['unread_delta']:
+            notification_bus.publish(user_id, {
+                'event': 'unread_count',
+                'data': {'delta': change['unread_delta']}
+            })
+
+    for listener in commit_listeners:
+        listener(changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_notification_changes(session):
+    session.info.pop('notification_changes', None)
+
+
+def record_bulk_change(session, user_id, unread_delta):
+    """
+    Register an unread-count change made by a bulk UPDATE/DELETE, which the
+    flush hooks cannot see. Published (and applied to listeners) on commit.
+    """
+    changes = _pending_changes(session)
+    change = changes.setdefault(user_id, {'created': [], 'updated': [], 'unread_delta': 0})
+    change['unread_delta'] += unread_delta
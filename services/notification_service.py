@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import and_, func, or_, select, update
+from config import Config
+from database import db
+from models.notification import Notification
+from models.user import User
+from services.unread_counter import unread_counter
+
+
+def next_event_seq(user_id):
+    """
+    Allocate the user's next notification event id. The UPDATE locks the
+    user's row until commit, so ids become visible in the order issued.
+    """
+    db.session.execute(
+        # Keep updated_at: the counter is not a profile change
+        update(User).where(User.id == user_id).values(
+            notification_seq=User.notification_seq + 1,
+            updated_at=User.updated_at
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    return db.session.execute(select(User.notification_seq).where(User.id == user_id)).scalar_one()
+
+
+def notify(user_id, message, type, link=None):
+    """
+    Add a notification for user_id. A repeat of a recent unread notification
+    with the same type and link is coalesced into it (its count goes up, it
+    takes the newest message and moves to the top) instead of adding
+    another row. Either way the row gets a new event_seq, so streams that
+    resume from Last-Event-ID replay the change.
+    """
+    now = datetime.utcnow()
+    window_start = now - timedelta(minutes=Config.NOTIFICATION_COALESCE_MINUTES)
+    existing = Notification.query.filter_by(user_id=user_id, type=type, link=link, read=False)\
+        .filter(Notification.created_at >= window_start)\
+        .order_by(Notification.created_at.desc(), Notification.id.desc()).first()
+
+    if existing is not None:
+        existing.group_count = (existing.group_count or 1) + 1
+        existing.message = message
+        existing.created_at = now
+        existing.event_seq = next_event_seq(user_id)
+        return existing
+
+    notification = Notification(
+        user_id=user_id,
+        message=message,
+        type=type,
+        link=link,
+        created_at=now,
+        event_seq=next_event_seq(user_id)
+    )
+    db.session.add(notification)
+    return notification
+
+
+def _delete_in_batches(id_query, batch_size):
+    """
+    Delete the rows selected by id_query (which must select id and user_id)
+    one short transaction per batch. Returns (deleted, affected user ids).
+    """
+    deleted = 0
+    users = set()
+    while True:
+        rows = id_query.limit(batch_size).all()
+        if not rows:
+            break
+
+        Notification.query.filter(Notification.id.in_([row.id for row in rows]))\
+            .delete(synchronize_session=False)
+        db.session.commit()
+
+        deleted += len(rows)
+        users.update(row.user_id for row in rows)
+        if len(rows) < batch_size:
+            break
+    return deleted, users
+
+
+def prune_notifications(max_age_days=None, max_per_user=None, batch_size=None):
+    """
+    Apply the retention policy: drop notifications older than max_age_days,
+    then trim each user to their max_per_user newest notifications
+    """
+    max_age_days = max_age_days or Config.NOTIFICATION_MAX_AGE_DAYS
+    max_per_user = max_per_user or Config.NOTIFICATION_MAX_PER_USER
+    batch_size = batch_size or Config.NOTIFICATION_PRUNE_BATCH_SIZE
+
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    expired = db.session.query(Notification.id, Notification.user_id)\
+        .filter(Notification.created_at < cutoff).order_by(Notification.id)
+    deleted, affected_users = _delete_in_batches(expired, batch_size)
+
+    over_limit = db.session.query(Notification.user_id)\
+        .group_by(Notification.user_id)\
+        .having(func.count(Notification.id) > max_per_user).all()
+
+    for (user_id,) in over_limit:
+        # Oldest notification the user is allowed to keep
+        boundary = db.session.query(Notification.created_at, Notification.id)\
+            .filter(Notification.user_id == user_id)\
+            .order_by(Notification.created_at.desc(), Notification.id.desc())\
+            .offset(max_per_user - 1).limit(1).first()
+        if boundary is None:
+            continue
+
+        excess = db.session.query(Notification.id, Notification.user_id).filter(
+            Notification.user_id == user_id,
+            or_(
+                Notification.created_at < boundary.created_at,
+                and_(Notification.created_at == boundary.created_at, Notification.id < boundary.id)
+            )
+        )
+        user_deleted, _ = _delete_in_batches(excess, batch_size)
+        deleted += user_deleted
+        affected_users.add(user_id)
+
+    # Bulk deletes bypass the ORM hooks; reload these counts from the database
+    for user_id in affected_users:
+        unread_counter.invalidate(user_id)
+
+    return {'deleted': deleted, 'users': len(affected_users)}
+
+
+@click.command('prune-notifications')
+@click.option('--max-age-days', type=int, default=None, help='Delete notifications older than this')
+@click.option('--max-per-user', type=int, default=None, help='Keep at most this many per user')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction')
+@with_appcontext
+def prune_notifications_command(max_age_days, max_per_user, batch_size):
+    """Apply the notification retention policy."""
+    result = prune_notifications(max_age_days, max_per_user, batch_size)
+    click.echo(f"Deleted {result['deleted']} notification(s) for {result['users']} user(s)")
@@ -0,0 +1,228 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from config import Config
+from database import db
+from services.analysis_executor import analysis_executor
+from models.review import CodeReview
+from services.ai_service import AIService
+from services.job_queue import QueueFullError, create_job_queue
+from services.notification_service import notify
+from services.stats_service import record_review
+
+ai_service = AIService()
+
+_queue = None
+_queue_lock = threading.Lock()
+_owner = None
+_sweeper = None
+
+
+def get_review_queue():
+    """
+    Return the process-wide review job queue, creating it on first use
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = create_job_queue()
+        return _queue
+
+
+def enqueue_review(app, review_id):
+    """
+    Schedule the analysis and AI review of a pending CodeReview row
+    """
+    return get_review_queue().enqueue(process_review, app, review_id)
+
+
+def process_review(app, review_id):
+    """
+    Run static analysis and the AI review for a pending CodeReview, then
+    store the results and notify the user
+    """
+    with app.app_context():
+        # Claim the row so a job queued twice (e.g. by sweeps in several
+        # workers) runs once
+        claimed = CodeReview.query.filter_by(id=review_id, status='pending').update(
+            {'status': 'processing'}, synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            db.session.remove()
+            return
+        review = db.session.get(CodeReview, review_id)
+
+        try:
+            analysis = analysis_executor.analyze(review.code, review.language)
+            ai_feedback = ai_service.review_code(review.code, review.language)
+
+            review.ai_feedback = ai_feedback
+            review.review_data = analysis
+            review.quality_score = analysis.get('quality_score', 0)
+            review.issues_found = analysis.get('issues_count', 0)
+            review.complexity_score = analysis.get('complexity', 0)
+            review.maintainability_index = analysis.get('maintainability_index', 0)
+            review.status = 'completed'
+            record_review(review)
+
+            notify(
+                review.user_id,
+                f'Code review for "{review.title}" completed successfully',
+                type='review_complete',
+                link='/code-review'
+            )
+            db.session.commit()
+
+        except Exception as e:
+            print(f"Review job {review_id} failed: {str(e)}")
+            traceback.print_exc()
+            db.session.rollback()
+
+            review = db.session.get(CodeReview, review_id)
+            if review is None:
+                return
+            review.status = 'failed'
+            review.error = str(e)
+
+            notify(
+                review.user_id,
+                f'Code review for "{review.title}" failed',
+                type='error',
+                link='/code-review'
+            )
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+
+def job_owner_id():
+    """Identify this process as the owner of the review jobs it queues"""
+    global _owner
+    # Recomputed after a fork so each worker process has its own id
+    if _owner is None or _owner[0] != os.getpid():
+        _owner = (os.getpid(), f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}')
+    return _owner[1]
+
+
+def heartbeat_review_jobs():
+    """
+    Mark the reviews this process has queued or is processing as alive.
+    Returns the number of rows touched.
+    """
+    touched = CodeReview.query.filter(
+        CodeReview.status.in_(('pending', 'processing')),
+        CodeReview.job_owner == job_owner_id()
+    ).update({'job_heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return touched
+
+
+def recover_review_jobs(app, lease_seconds=None):
+    """
+    Recover reviews whose jobs were lost with the process that queued them
+    (the queue lives in memory): their owner stopped refreshing the
+    heartbeat more than lease_seconds ago. Pending reviews are claimed by
+    this process and queued again; ones that were being processed are
+    marked failed (and their users notified, as process_review would),
+    since the job may be what brought the worker down.
+    Returns (requeued, failed) counts.
+    """
+    lease_seconds = Config.REVIEW_JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+    now = datetime.utcnow()
+    expired = db.or_(
+        CodeReview.job_heartbeat_at.is_(None),
+        CodeReview.job_heartbeat_at < now - timedelta(seconds=lease_seconds)
+    )
+
+    interrupted = CodeReview.query.filter(CodeReview.status == 'processing', expired)\
+        .with_entities(CodeReview.id, CodeReview.user_id, CodeReview.title).all()
+    failed = 0
+    for row in interrupted:
+        # Re-checked per row so processes sweeping at the same time notify once
+        marked = CodeReview.query.filter(
+            CodeReview.id == row.id, CodeReview.status == 'processing', expired
+        ).update({
+            'status': 'failed',
+            'error': 'Review was interrupted by a server restart, please submit it again'
+        }, synchronize_session=False)
+        if not marked:
+            continue
+        notify(
+            row.user_id,
+            f'Code review for "{row.title}" failed',
+            type='error',
+            link='/code-review'
+        )
+        failed += 1
+    pending_ids = [
+        row.id for row in CodeReview.query.filter(CodeReview.status == 'pending', expired).with_entities(CodeReview.id)
+    ]
+    db.session.commit()
+
+    requeued = 0
+    for review_id in pending_ids:
+        # Take ownership first so processes sweeping at the same time do
+        # not both queue the review
+        claimed = CodeReview.query.filter(
+            CodeReview.id == review_id, CodeReview.status == 'pending', expired
+        ).update({'job_owner': job_owner_id(), 'job_heartbeat_at': now}, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            continue
+        try:
+            enqueue_review(app, review_id)
+        except QueueFullError:
+            # Give the review back; the rest stay pending for the next sweep
+            CodeReview.query.filter_by(id=review_id).update({'job_heartbeat_at': None}, synchronize_session=False)
+            db.session.commit()
+            break
+        requeued += 1
+    return requeued, failed
+
+
+def sweep_review_jobs(app):
+    """Refresh this process's heartbeats and recover lost reviews"""
+    with app.app_context():
+        try:
+            # Nothing to recover before the first migration
+            if not db.inspect(db.engine).has_table(CodeReview.__tablename__):
+                return
+            heartbeat_review_jobs()
+            requeued, failed = recover_review_jobs(app)
+            if requeued or failed:
+                print(f"Review jobs recovered: {requeued} requeued, {failed} marked failed")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Review job recovery Error: {str(e)}")
+        finally:
+            db.session.remove()
+
+
+def _sweep_forever(app):
+    while True:
+        time.sleep(Config.REVIEW_JOB_HEARTBEAT_SECONDS)
+        sweep_review_jobs(app)
+
+
+def init_review_jobs(app):
+    """
+    Recover lost reviews at startup, then keep this process's heartbeats
+    fresh and sweep again every REVIEW_JOB_HEARTBEAT_SECONDS (if enabled).
+    Called by web workers only (gunicorn's post_worker_init hook and the
+    development server): a CLI command or script that builds the app would
+    otherwise claim reviews into a queue that dies with it.
+    """
+    global _sweeper
+    if not Config.REVIEW_JOB_LEASE_SECONDS:
+        return
+
+    sweep_review_jobs(app)
+    with _queue_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = threading.Thread(target=_sweep_forever, args=(app,), name='review-job-sweeper', daemon=True)
+            _sweeper.start()
@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Delete the lock only if this flight still holds it, atomically: with
+# separate GET and DEL the lock could expire in between and the DEL would
+# release another worker's flight
+_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key so only one of them runs.
+
+    Within a process, the first caller (the leader) runs the function and
+    every caller that arrives while it is in flight waits for and shares
+    its result or exception. With a Redis URL, the leader also takes a
+    short Redis lock and publishes its (JSON serializable) result under
+    the lock's token, so leaders in other workers that find the lock held
+    wait for that instead of calling upstream themselves. A call made
+    after the flight has landed runs again: results are never served as a
+    cache. Any Redis problem degrades to per-process coalescing.
+    """
+
+    def __init__(self, namespace, redis_url=None, lock_ttl=60, result_ttl=30, poll_interval=0.1):
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._redis = None
+        self._unlock_script = None
+        self._counters = {'calls': 0, 'leaders': 0, 'shared': 0, 'shared_remote': 0}
+
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            self._unlock_script = self._redis.register_script(_UNLOCK_SCRIPT)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def do(self, key, func):
+        """Return func(), sharing one execution among concurrent callers of key"""
+        with self._lock:
+            self._counters['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            self._count('shared')
+            return call.result()
+
+        self._count('leaders')
+        try:
+            result = self._run(key, func)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _run(self, key, func):
+        if self._redis is None:
+            return func()
+
+        lock_key = f'codesage:{self.namespace}:flight:{key}'
+        token = uuid.uuid4().hex
+        try:
+            acquired = self._redis.set(lock_key, token, nx=True, ex=self.lock_ttl)
+            holder = None if acquired else self._redis.get(lock_key)
+        except Exception as e:
+            print(f"Single-flight Redis Error: {str(e)}")
+            return func()
+
+        if acquired:
+            try:
+                result = func()
+                self._publish(lock_key, token, result)
+                return result
+            finally:
+                self._unlock(lock_key, token)
+
+        # holder is None when the flight landed between the two commands
+        shared = self._wait(lock_key, holder.decode('ascii')) if holder is not None else None
+        if shared is not None:
+            self._count('shared_remote')
+            return json.loads(shared)
+        # The other worker failed or its lock expired; call upstream ourselves
+        return func()
+
+    @staticmethod
+    def _result_key(lock_key, token):
+        # Scoped to one flight, so only its waiters can find the result
+        return f'{lock_key}:result:{token}'
+
+    def _publish(self, lock_key, token, result):
+        try:
+            # Kept just long enough for the waiters' next poll
+            self._redis.set(self._result_key(lock_key, token), json.dumps(result), ex=self.result_ttl)
+        except Exception as e:
+            print(f"Single-flight Redis Error: {str(e)}")
+
+    def _unlock(self, lock_key, token):
+        try:
+            self._unlock_script(keys=[lock_key], args=[token])
+        except Exception as e:
+            print(f"Single-flight Redis Error: {str(e)}")
+
+    def _wait(self, lock_key, token):
+        """Wait for the flight holding the lock with token; None if it published nothing"""
+        result_key = self._result_key(lock_key, token)
+        deadline = time.monotonic() + self.lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                shared = self._redis.get(result_key)
+                if shared is not None:
+                    return shared
+                if self._redis.get(lock_key) != token.encode('ascii'):
+                    # Released: the result is either there now or was never published
+                    return self._redis.get(result_key)
+                time.sleep(self.poll_interval)
+        except Exception as e:
+            print(f"Single-flight Redis Error: {str(e)}")
+        return None
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._calls)
+        counters['redis_enabled'] = self._redis is not None
+        return counters
+
+
+ai_flights = SingleFlight(
+    'ai',
+    redis_url=Config.REDIS_URL,
+    lock_ttl=Config.AI_SINGLE_FLIGHT_LOCK_TTL,
+    result_ttl=Config.AI_SINGLE_FLIGHT_RESULT_TTL
+)
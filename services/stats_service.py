@@ -0,0 +1,172 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.exc import IntegrityError
+from database import db
+from models.review_stats import UserReviewStats
+from utils.math_calculator import MetricsCalculator
+
+RECENT_SCORES_LIMIT = 10
+
+COMPLEXITY_COLUMNS = {
+    'low': 'complexity_low',
+    'medium': 'complexity_medium',
+    'high': 'complexity_high',
+    'very_high': 'complexity_very_high'
+}
+
+
+def complexity_bucket(complexity):
+    complexity = complexity or 0
+    if complexity < 5:
+        return 'low'
+    if complexity < 10:
+        return 'medium'
+    if complexity < 15:
+        return 'high'
+    return 'very_high'
+
+
+def _locked_stats(user_id, pending=()):
+    """
+    Load the user's rollup row for update. A missing row is created from
+    the reviews already stored, leaving out `pending` (reviews the caller
+    is about to add itself). Runs inside the caller's transaction.
+    """
+    stats = UserReviewStats.query.filter_by(user_id=user_id).with_for_update().first()
+    if stats is not None:
+        return stats
+
+    # Aggregate before begin_nested() flushes the caller's changes
+    with db.session.no_autoflush:
+        values = _aggregate_stats(user_id, exclude_ids=[review.id for review in pending if review.id is not None])
+
+    try:
+        with db.session.begin_nested():
+            stats = UserReviewStats(user_id=user_id, **values)
+            db.session.add(stats)
+        return stats
+    except IntegrityError:
+        # Another transaction created the row first
+        return UserReviewStats.query.filter_by(user_id=user_id).with_for_update().first()
+
+
+def record_review(review):
+    """
+    Add a completed review to its owner's rollup. Call before the commit
+    that persists the review so both land in the same transaction.
+    """
+    stats = _add_to_stats(_locked_stats(review.user_id, pending=[review]), review)
+    _refill_recent_scores(stats)
+    return stats
+
+
+def record_reviews(user_id, reviews):
+    """
+    record_review for many of one user's reviews, locking the rollup once
+    """
+    stats = _locked_stats(user_id, pending=reviews)
+    for review in reviews:
+        _add_to_stats(stats, review)
+    _refill_recent_scores(stats)
+    return stats
+
+
+def _refill_recent_scores(stats, exclude_ids=()):
+    """
+    Reload the recent scores window. Queued and batch reviews complete out
+    of created_at order, so prepending on completion would drift from what
+    _aggregate_stats rebuilds. The caller's pending reviews are flushed first.
+    """
+    stats.recent_scores = MetricsCalculator.recent_scores(stats.user_id, RECENT_SCORES_LIMIT, exclude_ids)
+
+
+def _add_to_stats(stats, review):
+    stats.total_reviews += 1
+    stats.score_sum += review.quality_score or 0
+    stats.issue_sum += review.issues_found or 0
+
+    languages = dict(stats.languages or {})
+    languages[review.language] = languages.get(review.language, 0) + 1
+    stats.languages = languages
+
+    column = COMPLEXITY_COLUMNS[complexity_bucket(review.complexity_score)]
+    setattr(stats, column, getattr(stats, column) + 1)
+    return stats
+
+
+def remove_review(review):
+    """
+    Remove a completed review from its owner's rollup. Call before the
+    commit that deletes the review.
+    """
+    stats = _locked_stats(review.user_id)
+    stats.total_reviews = max(0, stats.total_reviews - 1)
+    stats.score_sum -= review.quality_score or 0
+    stats.issue_sum = max(0, stats.issue_sum - (review.issues_found or 0))
+
+    languages = dict(stats.languages or {})
+    if languages.get(review.language, 0) > 1:
+        languages[review.language] -= 1
+    else:
+        languages.pop(review.language, None)
+    stats.languages = languages
+
+    column = COMPLEXITY_COLUMNS[complexity_bucket(review.complexity_score)]
+    setattr(stats, column, max(0, getattr(stats, column) - 1))
+
+    # The deleted review may have been one of the recent ones
+    _refill_recent_scores(stats, exclude_ids=[review.id])
+    return stats
+
+
+def _aggregate_stats(user_id, exclude_ids=()):
+    """Rollup column values computed from the code_reviews table"""
+    totals = MetricsCalculator.review_totals(user_id, exclude_ids)
+    buckets = MetricsCalculator.complexity_buckets(user_id, exclude_ids)
+
+    values = {
+        'total_reviews': totals['total_reviews'],
+        'score_sum': totals['score_sum'],
+        'issue_sum': totals['total_issues'],
+        'languages': MetricsCalculator.language_distribution(user_id, exclude_ids),
+        'recent_scores': MetricsCalculator.recent_scores(user_id, RECENT_SCORES_LIMIT, exclude_ids)
+    }
+    for bucket, column in COMPLEXITY_COLUMNS.items():
+        values[column] = buckets[bucket]
+    return values
+
+
+def rebuild_user_stats(user_id):
+    """
+    Recompute a user's rollup from the code_reviews table
+    """
+    stats = _locked_stats(user_id)
+    for column, value in _aggregate_stats(user_id).items():
+        setattr(stats, column, value)
+    return stats
+
+
+def get_user_stats(user_id):
+    """
+    Read a user's rollup, backfilling it on first access
+    """
+    stats = db.session.get(UserReviewStats, user_id)
+    if stats is None:
+        # Creating the row seeds it from the stored reviews
+        stats = _locked_stats(user_id)
+        db.session.commit()
+    return stats
+
+
+@click.command('rebuild-review-stats')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user')
+@with_appcontext
+def rebuild_review_stats_command(user_id):
+    """Backfill or repair the user_review_stats rollup."""
+    from models.user import User
+
+    user_ids = [user_id] if user_id else [uid for (uid,) in db.session.query(User.id)]
+    for uid in user_ids:
+        rebuild_user_stats(uid)
+        db.session.commit()
+    click.echo(f'Rebuilt review stats for {len(user_ids)} user(s)')
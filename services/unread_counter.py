@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from services.notification_bus import commit_listeners
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# INCRBY only if the key still exists (clamped at 0), atomically: a key
+# that expired between separate EXISTS and INCRBY calls would be
+# recreated without a TTL and never reconcile
+_ADJUST_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return nil
+end
+local count = redis.call('incrby', KEYS[1], ARGV[1])
+if count < 0 then
+    redis.call('set', KEYS[1], 0, 'KEEPTTL')
+    count = 0
+end
+return count
+"""
+
+
+class UnreadCounter:
+    """
+    Per-user unread notification counts kept in Redis and adjusted as
+    notifications are committed. Each entry is reloaded from the database
+    once it is older than the reconcile interval, which heals any drift
+    from missed updates.
+
+    Without Redis every read goes to the database: a per-process cache
+    would not see changes committed by other workers. local_cache keeps
+    counts in an in-process LRU instead, for single-worker deployments.
+    """
+
+    def __init__(self, max_users=10000, reconcile_interval=300, redis_url=None, local_cache=False):
+        self.local_cache = local_cache
+        self.max_users = max_users
+        self.reconcile_interval = reconcile_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._adjust_script = None
+        self._counters = {'hits': 0, 'misses': 0}
+
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            self._adjust_script = self._redis.register_script(_ADJUST_SCRIPT)
+
+    def _redis_key(self, user_id):
+        return f'codesage:unread:{user_id}'
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _cached(self, user_id):
+        if self._redis is not None:
+            try:
+                value = self._redis.get(self._redis_key(user_id))
+                return int(value) if value is not None else None
+            except Exception as e:
+                print(f"Unread counter Redis Error: {str(e)}")
+
+        if not self.local_cache:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            count, synced_at = entry
+            if time.monotonic() - synced_at > self.reconcile_interval:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return count
+
+    def get(self, user_id, loader):
+        """
+        Return the unread count for user_id, calling loader() for the
+        authoritative value on a miss or when the entry is due to reconcile
+        """
+        count = self._cached(user_id)
+        if count is not None:
+            self._count('hits')
+            return count
+
+        self._count('misses')
+        count = loader()
+        self.set(user_id, count)
+        return count
+
+    def set(self, user_id, count):
+        count = max(0, int(count))
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self._redis_key(user_id), count, ex=int(self.reconcile_interval))
+                return
+            except Exception as e:
+                print(f"Unread counter Redis Error: {str(e)}")
+
+        if not self.local_cache:
+            return
+        with self._lock:
+            self._entries[user_id] = (count, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def adjust(self, user_id, delta):
+        """
+        Apply a committed change; users without a cached count are skipped
+        and will be loaded from the database on their next read
+        """
+        if not delta:
+            return
+
+        if self._redis is not None:
+            try:
+                self._adjust_script(keys=[self._redis_key(user_id)], args=[int(delta)])
+                return
+            except Exception as e:
+                print(f"Unread counter Redis Error: {str(e)}")
+
+        if not self.local_cache:
+            return
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                count, synced_at = entry
+                self._entries[user_id] = (max(0, count + delta), synced_at)
+
+    def invalidate(self, user_id):
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._redis_key(user_id))
+            except Exception as e:
+                print(f"Unread counter Redis Error: {str(e)}")
+
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            counters['cached_users'] = len(self._entries)
+        counters['redis_enabled'] = self._redis is not None
+        counters['local_cache'] = self.local_cache
+        return counters
+
+
+unread_counter = UnreadCounter(
+    max_users=Config.UNREAD_COUNT_CACHE_USERS,
+    reconcile_interval=Config.UNREAD_COUNT_RECONCILE_SECONDS,
+    redis_url=Config.REDIS_URL,
+    local_cache=Config.UNREAD_COUNT_LOCAL_CACHE
+)
+
+
+def _apply_committed_changes(changes):
+    for user_id, change in changes.items():
+        unread_counter.adjust(user_id, change['unread_delta'])
+
+
+commit_listeners.append(_apply_committed_changes)
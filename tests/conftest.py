@@ -0,0 +1,103 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from config import Config
+from database import db
+from models.user import User
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+def _ok(request):
+    return 200, {'Content-Type': 'application/json'}, b'{"ok": true}'
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers each request over HTTP/1.1 keep-alive with server.respond(request),
+    which returns (status, headers, body). A list body is sent chunk by
+    chunk with chunked transfer encoding.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        self.server.client_ports.append(self.client_address[1])
+        length = int(self.headers.get('Content-Length') or 0)
+        # One handler serves every request on a keep-alive connection
+        request = SimpleNamespace(
+            command=self.command, path=self.path, headers=self.headers, body=self.rfile.read(length)
+        )
+        self.server.requests.append(request)
+
+        status, headers, body = self.server.respond(request)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if isinstance(body, list):
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for chunk in body:
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    do_GET = do_POST = _handle
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Local HTTP server. Set server.respond to change the answer; server.requests
+    holds each request (command, path, headers, body) and
+    server.client_ports the peer port it came from.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    server.respond = _ok
+    server.requests = []
+    server.client_ports = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app():
+    """Application on a fresh in-memory SQLite database, inside an app context"""
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def auth_client(app):
+    """
+    Test client sending a JWT for a freshly created user, whose id is
+    auth_client.user_id
+    """
+    user = User(email='dev@example.com', password_hash='-', name='Dev')
+    db.session.add(user)
+    db.session.commit()
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=user.id)}'
+    client.user_id = user.id
+    return client
@@ -0,0 +1,19 @@
+import json
+from services.ai_providers import OpenAICompatibleProvider
+
+
+def test_openai_needs_a_key_but_local_servers_do_not():
+    assert not OpenAICompatibleProvider('gpt-4o-mini', None, 'https://api.openai.com/v1').is_configured()
+    assert OpenAICompatibleProvider('gpt-4o-mini', 'sk-test', 'https://api.openai.com/v1').is_configured()
+    assert OpenAICompatibleProvider('llama3', None, 'http://localhost:11434/v1').is_configured()
+
+
+def test_keyless_server_gets_no_authorization_header(stub_server):
+    reply = {'choices': [{'message': {'content': 'Hello'}}]}
+    stub_server.respond = lambda request: (200, {'Content-Type': 'application/json'}, json.dumps(reply).encode())
+    provider = OpenAICompatibleProvider('llama3', None, stub_server.url + '/v1')
+
+    assert provider.generate('Hi') == 'Hello'
+    request = stub_server.requests[-1]
+    assert request.path == '/v1/chat/completions'
+    assert 'Authorization' not in request.headers
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services import analysis_executor
+from services.analysis_executor import AnalysisExecutor
+from utils import cache
+
+
+def test_recycle_keeps_queued_jobs(monkeypatch):
+    # Every call must reach the pool, not the result cache
+    monkeypatch.setattr(cache.analysis_cache, 'get', lambda key: None)
+    executor = AnalysisExecutor(workers=1, timeout=60, max_jobs_per_worker=3)
+    codes = [f'def f{i}(x):\n    return x + {i}\n' * 50 for i in range(12)]
+    try:
+        with ThreadPoolExecutor(max_workers=12) as threads:
+            results = list(threads.map(lambda code: executor.analyze(code, 'python'), codes))
+    finally:
+        executor.shutdown()
+
+    # Pools were replaced while other requests had jobs queued on them
+    assert executor.stats()['recycles'] >= 2
+    assert all(result['total_lines'] == 101 for result in results)
+
+
+def _slow_analysis(code, language):
+    time.sleep(0.4)
+    return {'total_lines': 1}
+
+
+def test_timeout_excludes_queue_wait(monkeypatch):
+    monkeypatch.setattr(cache.analysis_cache, 'get', lambda key: None)
+    monkeypatch.setattr(analysis_executor, '_run_analysis', _slow_analysis)
+    executor = AnalysisExecutor(workers=1, timeout=1.5)
+    codes = [f'x = {i}\n' for i in range(5)]
+    try:
+        with ThreadPoolExecutor(max_workers=5) as threads:
+            results = list(threads.map(lambda code: executor.analyze(code, 'python'), codes))
+    finally:
+        executor.shutdown()
+
+    # Five 0.4s jobs on one worker take 2s in total, but none runs for 1.5s
+    assert results == [{'total_lines': 1}] * 5
+    assert executor.stats()['timeouts'] == 0
+    assert executor.stats()['recycles'] == 0
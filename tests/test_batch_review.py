@@ -0,0 +1,49 @@
+import pytest
+from config import Config
+from routes import code_review
+from services.ai_providers import StubProvider
+from services.ai_service import AIService
+from utils.cache import ai_review_cache
+
+FILES = [
+    {'name': f'module_{i}.py', 'code': f'def f{i}(x):\n    return x * {i}\n', 'language': 'python'}
+    for i in range(3)
+]
+
+
+@pytest.fixture
+def client(auth_client, monkeypatch):
+    monkeypatch.setattr(code_review, 'ai_service', AIService(StubProvider(latency=0)))
+    ai_review_cache.clear()
+    yield auth_client
+    ai_review_cache.clear()
+
+
+def test_batch_reports_provider_calls_made(client):
+    first = client.post('/api/reviews/batch', json={'files': FILES})
+    assert first.status_code == 201
+    # Small files share one prompt
+    assert first.get_json()['ai_calls'] == 1
+
+    # Every file is now cached; nothing reaches the provider
+    again = client.post('/api/reviews/batch', json={'files': FILES})
+    assert again.status_code == 201
+    assert again.get_json()['ai_calls'] == 0
+
+
+def test_batch_counts_each_chunk_of_a_large_file(client, monkeypatch):
+    monkeypatch.setattr(Config, 'AI_PROMPT_TOKEN_BUDGET', 20)
+    code = ''.join(f'def g{i}(x):\n    total = x + {i}\n    return total * {i}\n\n\n' for i in range(4))
+    chunks = code_review.ai_service.chunker.chunk_code(code, 'python', Config.AI_PROMPT_TOKEN_BUDGET * 4)
+    assert len(chunks) > 1
+
+    response = client.post('/api/reviews/batch', json={'files': [{'name': 'big.py', 'code': code}]})
+    assert response.status_code == 201
+    # One group, but a provider call per chunk
+    assert response.get_json()['ai_calls'] == len(chunks)
+
+
+def test_batch_over_total_size_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(Config, 'REVIEW_BATCH_MAX_BYTES', 64)
+    response = client.post('/api/reviews/batch', json={'files': FILES})
+    assert response.status_code == 413
@@ -0,0 +1,119 @@
+import time
+import pytest
+import requests
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def client_error():
+    response = requests.Response()
+    response.status_code = 400
+    return requests.HTTPError('400 Bad Request', response=response)
+
+
+def test_adaptive_timeout_is_kept_per_kind():
+    breaker = CircuitBreaker('test', min_calls=3, min_timeout=1, max_timeout=60)
+    for _ in range(5):
+        breaker.record_success(0.5, 'text')
+        breaker.record_success(10, 'review')
+
+    # Fast text prompts do not pull the timeout of slow reviews down
+    assert breaker.timeout('text') == 1
+    assert breaker.timeout('review') == 20
+
+
+def test_raising_calls_record_no_latency():
+    breaker = CircuitBreaker('test', min_calls=3, min_timeout=1, max_timeout=60)
+    for _ in range(5):
+        breaker.record_success(10, 'review')
+
+    def fail(timeout):
+        raise client_error()
+
+    for _ in range(20):
+        with pytest.raises(requests.HTTPError):
+            breaker.call(fail, 'review')
+
+    # Client errors keep the circuit closed without becoming latency samples
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.timeout('review') == 20
+
+
+def server_error(timeout):
+    raise requests.ConnectionError('connection reset')
+
+
+def open_breaker(**options):
+    breaker = CircuitBreaker('test', window=10, min_calls=4, failure_rate=0.5, **options)
+    for _ in range(4):
+        with pytest.raises(requests.ConnectionError):
+            breaker.call(server_error)
+    return breaker
+
+
+def test_opens_at_failure_rate_and_fails_fast():
+    breaker = CircuitBreaker('test', window=10, min_calls=4, failure_rate=0.5, open_seconds=60)
+    breaker.call(lambda timeout: 'ok')
+    breaker.call(lambda timeout: 'ok')
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(server_error)
+    # Below min_calls the circuit stays closed
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(server_error)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda timeout: calls.append(timeout))
+    assert calls == []
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_probe_success_closes():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+
+    assert breaker.call(lambda timeout: 'ok') == 'ok'
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['window_failure_rate'] == 0
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+
+    with pytest.raises(requests.ConnectionError):
+        breaker.call(server_error)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda timeout: 'ok')
+
+
+def test_half_open_admits_one_probe():
+    breaker = open_breaker(open_seconds=0.05)
+    time.sleep(0.06)
+
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_stream_error_mid_stream_is_a_failure():
+    breaker = CircuitBreaker('test', window=10, min_calls=1, failure_rate=0.5, open_seconds=60)
+
+    def start(timeout):
+        yield 'partial'
+        raise requests.ReadTimeout('read timed out')
+
+    fragments = breaker.call_stream(start)
+    assert next(fragments) == 'partial'
+    with pytest.raises(requests.ReadTimeout):
+        next(fragments)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_stream_records_latency_when_finished():
+    breaker = CircuitBreaker('test', min_calls=1, min_timeout=1, max_timeout=60)
+    assert list(breaker.call_stream(lambda timeout: iter(['a', 'b']), 'review')) == ['a', 'b']
+    assert breaker.stats()['timeouts'] == {'review': 1}
@@ -0,0 +1,72 @@
+import json
+import time
+import pytest
+from config import Config
+from services import github_service
+from services.github_service import GitHubService, RateLimitTracker
+from utils.cache import github_cache
+
+REPOS = [{'name': 'alpha', 'stargazers_count': 3}]
+
+
+@pytest.fixture
+def github(stub_server, monkeypatch):
+    """GitHubService pointed at the stub server, with an empty cache and rate limit"""
+    monkeypatch.setattr(github_service, 'rate_limit', RateLimitTracker(reserve=Config.GITHUB_RATE_LIMIT_RESERVE))
+    github_cache.clear()
+    service = GitHubService()
+    service.base_url = stub_server.url
+    yield service
+    github_cache.clear()
+
+
+def repos_response(repos, etag, remaining=4000):
+    headers = {
+        'Content-Type': 'application/json',
+        'ETag': etag,
+        'X-RateLimit-Limit': '5000',
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Reset': str(int(time.time()) + 3600)
+    }
+    return 200, headers, json.dumps(repos).encode('utf-8')
+
+
+def test_second_fetch_sends_if_none_match(github, stub_server):
+    responses = iter([repos_response(REPOS, '"v1"'), repos_response(REPOS + [{'name': 'beta'}], '"v2"')])
+    stub_server.respond = lambda request: next(responses)
+
+    github.get_user_repositories('octo')
+    repos = github.get_user_repositories('octo')
+
+    first, second = stub_server.requests
+    assert 'If-None-Match' not in first.headers
+    assert second.headers['If-None-Match'] == '"v1"'
+    # A changed resource replaces the cached copy
+    assert [repo['name'] for repo in repos] == ['alpha', 'beta']
+
+
+def test_not_modified_returns_cached_body(github, stub_server):
+    def respond(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return 304, {'ETag': '"v1"', 'X-RateLimit-Remaining': '4000'}, b''
+        return repos_response(REPOS, '"v1"')
+    stub_server.respond = respond
+
+    first = github.get_user_repositories('octo')
+    second = github.get_user_repositories('octo')
+
+    assert len(stub_server.requests) == 2
+    assert second == first
+    assert second[0]['name'] == 'alpha' and second[0]['stars'] == 3
+    assert github_service.rate_limit.stats()['not_modified'] == 1
+
+
+def test_low_rate_limit_serves_cache_without_request(github, stub_server):
+    stub_server.respond = lambda request: repos_response(REPOS, '"v1"', remaining=Config.GITHUB_RATE_LIMIT_RESERVE)
+
+    first = github.get_user_repositories('octo')
+    second = github.get_user_repositories('octo')
+
+    assert len(stub_server.requests) == 1
+    assert second == first
+    assert github_service.rate_limit.stats()['stale_served'] == 1
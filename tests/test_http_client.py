@@ -0,0 +1,23 @@
+from services.http_client import build_session, get_session, http_timeout
+
+
+def test_session_reuses_connection(stub_server):
+    session = build_session()
+    for _ in range(5):
+        response = session.get(f'{stub_server.url}/ping', timeout=http_timeout(5))
+        assert response.json() == {'ok': True}
+
+    # Every request arrived over the same keep-alive TCP connection
+    assert len(stub_server.client_ports) == 5
+    assert len(set(stub_server.client_ports)) == 1
+
+
+def test_new_session_opens_new_connection(stub_server):
+    for _ in range(2):
+        build_session().get(f'{stub_server.url}/ping', timeout=http_timeout(5))
+
+    assert len(set(stub_server.client_ports)) == 2
+
+
+def test_get_session_is_shared():
+    assert get_session() is get_session()
@@ -0,0 +1,13 @@
+def test_metrics_is_disabled_without_a_token(app):
+    assert app.test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_requires_the_token(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secret')
+    client = app.test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert 'review_queue' in response.get_json()
@@ -0,0 +1,88 @@
+import json
+from config import Config
+from database import db
+from models.user import User
+from services.notification_bus import notification_bus
+from services.notification_service import notify
+from services.unread_counter import unread_counter
+
+
+def test_unread_stream_releases_slot_when_closed_unread(auth_client):
+
+    # The server closes a HEAD response without iterating the event stream
+    for _ in range(notification_bus.max_connections_per_user + 1):
+        response = auth_client.head('/api/notifications/stream')
+        response.close()
+        assert response.status_code == 200
+
+    assert notification_bus.connection_count() == 0
+
+
+def test_resume_replays_merged_notification(auth_client, monkeypatch):
+    # End the stream right after the replayed backlog
+    monkeypatch.setattr(Config, 'SSE_MAX_STREAM_SECONDS', 0)
+    user_id = auth_client.user_id
+    first = notify(user_id, 'Review 1 completed', type='review_complete', link='/code-review')
+    db.session.commit()
+    seen = first.event_seq
+    other = notify(user_id, 'Project added', type='portfolio_added')
+    db.session.commit()
+    notify(user_id, 'Review 2 completed', type='review_complete', link='/code-review')
+    db.session.commit()
+
+    response = auth_client.get('/api/notifications/stream', headers={'Last-Event-ID': str(seen)})
+    frames = [dict(line.split(': ', 1) for line in frame.splitlines())
+              for frame in response.get_data(as_text=True).strip().split('\n\n')]
+    replayed = [(frame['event'], json.loads(frame['data'])) for frame in frames if 'id' in frame]
+
+    assert [(event, data['id']) for event, data in replayed] == [
+        ('notification', other.id),
+        ('notification_updated', first.id)
+    ]
+    assert replayed[1][1]['message'] == 'Review 2 completed'
+    assert replayed[1][1]['count'] == 2
+
+
+def test_stream_ends_when_events_are_dropped(auth_client):
+    response = auth_client.get('/api/notifications/stream', buffered=False)
+    (subscription,) = notification_bus._subscribers[auth_client.user_id]
+
+    # A slow client overflows its queue; later events must not be sent
+    for seq in range(subscription.events.maxsize + 1):
+        subscription.push({'event': 'notification', 'id': seq + 1, 'data': {}})
+    subscription.push({'event': 'notification', 'id': 1000, 'data': {}})
+
+    body = response.get_data(as_text=True)
+    assert 'id: ' not in body
+    assert notification_bus.connection_count() == 0
+
+
+def test_notify_leaves_user_updated_at_alone(auth_client):
+    user_id = auth_client.user_id
+    updated_at = db.session.get(User, user_id).updated_at
+
+    notify(user_id, 'Project added', type='portfolio_added')
+    db.session.commit()
+    db.session.expire_all()
+
+    user = db.session.get(User, user_id)
+    assert user.notification_seq == 1
+    assert user.updated_at == updated_at
+
+
+def test_mark_all_read_adjusts_the_cached_count(auth_client, monkeypatch):
+    monkeypatch.setattr(unread_counter, 'local_cache', True)
+    user_id = auth_client.user_id
+    unread_counter.invalidate(user_id)
+    for i in range(3):
+        notify(user_id, f'Project {i} added', type='portfolio_added', link=f'/portfolio/{i}')
+    db.session.commit()
+    assert auth_client.get('/api/notifications/unread-count').get_json()['count'] == 3
+
+    response = auth_client.put('/api/notifications/mark-all-read')
+    assert response.get_json()['updated'] == 3
+    # Applied as a delta, so a notification committed afterwards still counts
+    notify(user_id, 'Review completed', type='review_complete')
+    db.session.commit()
+    assert auth_client.get('/api/notifications/unread-count').get_json()['count'] == 1
+    unread_counter.invalidate(user_id)
@@ -0,0 +1,108 @@
+"""
+Regression checks that the per-user hot queries are served by their
+indexes. Each query is run through the same code path the app uses, its
+SQL is captured, and SQLite's EXPLAIN QUERY PLAN must name the index.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from database import db
+from models.notification import Notification
+from models.portfolio import Portfolio
+from models.review import CodeReview
+from utils.pagination import encode_cursor, keyset_page
+
+USER_ID = 1
+
+
+@contextmanager
+def captured_sql():
+    """Collect (statement, parameters) for every query sent to the database"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def query_plan(run):
+    """EXPLAIN QUERY PLAN details for the last statement run() executes"""
+    with captured_sql() as statements:
+        run()
+    statement, parameters = statements[-1]
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+def assert_uses_index(plan, index):
+    assert f'INDEX {index}' in plan, plan
+    assert 'SCAN' not in plan.replace(f'SCAN {index}', ''), plan
+
+
+class _Cursor:
+    created_at = datetime(2026, 1, 1)
+    id = 100
+
+
+@pytest.mark.parametrize('model, index', [
+    (CodeReview, 'ix_code_reviews_user_created'),
+    (Notification, 'ix_notifications_user_created'),
+    (Portfolio, 'ix_portfolios_user_created'),
+])
+@pytest.mark.parametrize('cursor', [None, encode_cursor(_Cursor)])
+def test_keyset_page_uses_user_created_index(app, model, index, cursor):
+    plan = query_plan(lambda: keyset_page(model.query.filter_by(user_id=USER_ID), model, cursor=cursor, limit=20))
+    assert_uses_index(plan, index)
+    # Ordered by the index, not a temporary B-tree sort
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+@pytest.fixture
+def notification_stats(app):
+    """
+    A user with many mostly read notifications, analyzed: without
+    statistics SQLite breaks ties between the user_id indexes by the order
+    they were created in, which varies with the hash seed
+    """
+    db.session.add_all(
+        Notification(user_id=USER_ID, message='-', type='info', read=seq % 20 != 0, event_seq=seq)
+        for seq in range(1, 201)
+    )
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def test_unread_count_uses_partial_index(app, notification_stats):
+    plan = query_plan(lambda: Notification.query.filter_by(user_id=USER_ID, read=False).count())
+    assert_uses_index(plan, 'ix_notifications_user_unread')
+
+
+def test_mark_all_read_uses_partial_index(app, notification_stats):
+    plan = query_plan(
+        lambda: Notification.query.filter_by(user_id=USER_ID, read=False)
+        .update({'read': True}, synchronize_session=False)
+    )
+    assert_uses_index(plan, 'ix_notifications_user_unread')
+
+
+def test_stream_replay_uses_event_seq_index(app, notification_stats):
+    plan = query_plan(lambda: Notification.query.filter(
+        Notification.user_id == USER_ID,
+        Notification.event_seq > 150
+    ).order_by(Notification.event_seq).limit(100).all())
+    assert_uses_index(plan, 'ix_notifications_user_event_seq')
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_github_import_prefetch_uses_index(app):
+    plan = query_plan(lambda: db.session.query(Portfolio.github_url).filter(
+        Portfolio.user_id == USER_ID,
+        Portfolio.github_url.isnot(None)
+    ).all())
+    assert_uses_index(plan, 'ix_portfolios_user_github')
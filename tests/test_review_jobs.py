@@ -0,0 +1,135 @@
+import threading
+from datetime import datetime, timedelta
+import pytest
+from database import db
+from models.notification import Notification
+from models.review import CodeReview
+from routes import code_review
+from services import review_jobs
+from services.ai_providers import StubProvider
+from services.ai_service import AIService
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    """Record the reviews the sweep queues instead of running them"""
+    ids = []
+    monkeypatch.setattr(review_jobs, 'enqueue_review', lambda app, review_id: ids.append(review_id))
+    return ids
+
+
+def add_review(user_id, status, owner, heartbeat_age):
+    review = CodeReview(
+        user_id=user_id, title=status, code='print(1)\n', language='python', status=status,
+        job_owner=owner, job_heartbeat_at=datetime.utcnow() - timedelta(seconds=heartbeat_age)
+    )
+    db.session.add(review)
+    db.session.commit()
+    return review.id
+
+
+def test_recently_queued_review_of_a_dead_process_is_requeued(app, auth_client, queued):
+    # Queued seconds before the process went away: no created_at cutoff applies
+    lost = add_review(auth_client.user_id, 'pending', 'old-host:1:dead', heartbeat_age=120)
+    interrupted = add_review(auth_client.user_id, 'processing', 'old-host:1:dead', heartbeat_age=120)
+    alive = add_review(auth_client.user_id, 'pending', 'other-host:2:live', heartbeat_age=5)
+
+    assert review_jobs.recover_review_jobs(app, lease_seconds=90) == (1, 1)
+    assert queued == [lost]
+
+    db.session.expire_all()
+    assert db.session.get(CodeReview, lost).job_owner == review_jobs.job_owner_id()
+    assert db.session.get(CodeReview, interrupted).status == 'failed'
+    assert db.session.get(CodeReview, alive).job_owner == 'other-host:2:live'
+
+    # The user of the interrupted review hears about it
+    assert [n.type for n in Notification.query.filter_by(user_id=auth_client.user_id)] == ['error']
+
+    # Claimed with a fresh heartbeat, so the next sweep leaves it alone
+    assert review_jobs.recover_review_jobs(app, lease_seconds=90) == (0, 0)
+    assert queued == [lost]
+
+
+def test_heartbeat_keeps_own_reviews_from_being_recovered(app, auth_client, queued):
+    own = add_review(auth_client.user_id, 'processing', review_jobs.job_owner_id(), heartbeat_age=600)
+    other = add_review(auth_client.user_id, 'pending', 'other-host:2:live', heartbeat_age=600)
+
+    assert review_jobs.heartbeat_review_jobs() == 1
+    assert review_jobs.recover_review_jobs(app, lease_seconds=90) == (1, 0)
+    assert queued == [other]
+
+    db.session.expire_all()
+    assert db.session.get(CodeReview, own).status == 'processing'
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    """
+    Capture queued reviews so the test runs them; analysis is canned and
+    the AI review waits for release (to observe 'processing')
+    """
+    queued = []
+    release = threading.Event()
+    provider = StubProvider(latency=0)
+    generate = provider.generate
+
+    def slow_generate(*args, **kwargs):
+        release.wait(5)
+        return generate(*args, **kwargs)
+
+    provider.generate = slow_generate
+    monkeypatch.setattr(code_review, 'enqueue_review', lambda app, review_id: queued.append(review_id))
+    monkeypatch.setattr(review_jobs, 'ai_service', AIService(provider))
+    monkeypatch.setattr(review_jobs.analysis_executor, 'analyze', lambda code, language: {
+        'quality_score': 80, 'issues_count': 0, 'complexity': 1, 'maintainability_index': 90
+    })
+    return queued, release
+
+
+def status(client, review_id):
+    response = client.get(f'/api/reviews/{review_id}/status')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_async_review_moves_from_pending_to_completed(app, auth_client, jobs):
+    queued, release = jobs
+
+    response = auth_client.post('/api/reviews?async=1', json={'code': 'print(1)\n', 'title': 'Job'})
+    assert response.status_code == 202
+    review_id = response.get_json()['job_id']
+    assert queued == [review_id]
+    assert status(auth_client, review_id)['status'] == 'pending'
+
+    worker = threading.Thread(target=review_jobs.process_review, args=(app, review_id))
+    worker.start()
+    try:
+        for _ in range(100):
+            if status(auth_client, review_id)['status'] == 'processing':
+                break
+            threading.Event().wait(0.02)
+        assert status(auth_client, review_id)['status'] == 'processing'
+    finally:
+        release.set()
+        worker.join()
+
+    body = status(auth_client, review_id)
+    assert body['status'] == 'completed'
+    assert body['review']['quality_score'] == 80
+
+
+def test_async_review_failure_is_reported(app, auth_client, jobs, monkeypatch):
+    queued, release = jobs
+    release.set()
+
+    def broken(code, language):
+        raise RuntimeError('analysis crashed')
+
+    monkeypatch.setattr(review_jobs.analysis_executor, 'analyze', broken)
+
+    review_id = auth_client.post('/api/reviews?async=1', json={'code': 'print(1)\n'}).get_json()['job_id']
+    review_jobs.process_review(app, review_id)
+
+    body = status(auth_client, review_id)
+    assert body['status'] == 'failed'
+    assert body['error'] == 'analysis crashed'
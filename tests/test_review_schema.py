@@ -0,0 +1,22 @@
+import pytest
+from utils.review_schema import InvalidReview, extract_json, normalize_review
+
+
+def test_extract_json_skips_braces_in_leading_prose():
+    reply = 'note {x} and {"unclosed": 1 then {"quality_score": 5, "summary": "ok"}'
+    assert extract_json(reply) == {'quality_score': 5, 'summary': 'ok'}
+
+
+def test_extract_json_skips_balanced_non_object_candidates():
+    reply = 'Scores {0, 1} apply.\n{"quality_score": 80}'
+    assert extract_json(reply) == {'quality_score': 80}
+
+
+@pytest.mark.parametrize('score', ['NaN', 'nan', 'inf', '-Infinity', float('nan'), float('inf')])
+def test_non_finite_score_is_invalid(score):
+    with pytest.raises(InvalidReview):
+        normalize_review({'quality_score': score})
+
+
+def test_score_is_clamped():
+    assert normalize_review({'quality_score': '140'})['quality_score'] == 100.0
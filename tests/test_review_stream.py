@@ -0,0 +1,86 @@
+import json
+import pytest
+from database import db
+from models.review import CodeReview
+from routes import code_review
+from services.ai_providers import GeminiProvider
+from services.ai_service import AIService
+from utils.cache import ai_review_cache
+
+CODE = 'def add(a, b):\n    return a + b\n'
+
+REVIEW = {
+    'quality_score': 87,
+    'summary': 'Small and clear.',
+    'issues': [{'line': 1, 'severity': 'low', 'message': 'Add type hints'}],
+    'best_practices': ['Add a docstring'],
+    'refactoring': [],
+    'security': [],
+    'performance': [],
+    'testing': ['Cover negative numbers']
+}
+
+
+def gemini_sse(text, parts=6):
+    """streamGenerateContent?alt=sse chunks carrying text in several pieces"""
+    size = len(text) // parts + 1
+    return [
+        b'data: ' + json.dumps({'candidates': [{'content': {'parts': [{'text': text[i:i + size]}]}}]}).encode() + b'\r\n\r\n'
+        for i in range(0, len(text), size)
+    ]
+
+
+def parse_events(body):
+    events = []
+    for frame in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in frame.splitlines())
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+@pytest.fixture
+def gemini(stub_server, monkeypatch):
+    """Route the stream endpoint's AI service to a Gemini provider on the stub server"""
+    stub_server.respond = lambda request: (200, {'Content-Type': 'text/event-stream'}, gemini_sse(json.dumps(REVIEW)))
+    provider = GeminiProvider('gemini-2.5-flash', 'test-key', stub_server.url)
+    monkeypatch.setattr(code_review, 'ai_service', AIService(provider))
+    ai_review_cache.clear()
+    yield stub_server
+    ai_review_cache.clear()
+
+
+def test_stream_review_emits_events_and_saves_review(auth_client, gemini):
+    response = auth_client.post(
+        '/api/reviews/stream',
+        json={'code': CODE, 'language': 'python', 'title': 'Adder'}
+    )
+    assert response.status_code == 200
+    events = parse_events(response.get_data(as_text=True))
+
+    request = gemini.requests[0]
+    assert request.path.startswith('/models/gemini-2.5-flash:streamGenerateContent?alt=sse')
+    assert json.loads(request.body)['generationConfig'] == {'responseMimeType': 'application/json'}
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == 'analysis' and kinds[-1] == 'review'
+    deltas = [payload for kind, payload in events if kind == 'delta']
+    assert len(deltas) > 1
+    assert ''.join(deltas) == json.dumps(REVIEW)
+
+    fields = {}
+    for kind, payload in events:
+        if kind == 'field':
+            fields.update(payload)
+    assert fields['quality_score'] == 87
+    assert fields['summary'] == 'Small and clear.'
+    assert fields['issues'] == REVIEW['issues']
+
+    saved = events[-1][1]
+    assert saved['ai_feedback']['summary'] == 'Small and clear.'
+    db.session.expire_all()
+    review = db.session.get(CodeReview, saved['id'])
+    assert review.user_id == auth_client.user_id and review.title == 'Adder'
+    assert review.code == CODE
+    assert review.ai_feedback['quality_score'] == 87
+    assert review.ai_feedback['issues'][0]['message'] == 'Add type hints'
+    assert review.ai_feedback['testing'] == ['Cover negative numbers']
@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from services.single_flight import _UNLOCK_SCRIPT, SingleFlight
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def workers():
+    """Two SingleFlight instances sharing one Redis, as in two worker processes"""
+    server = fakeredis.FakeServer()
+    flights = (SingleFlight('test'), SingleFlight('test'))
+    for flight in flights:
+        flight._redis = fakeredis.FakeRedis(server=server)
+        flight._unlock_script = flight._redis.register_script(_UNLOCK_SCRIPT)
+    return flights
+
+
+def counting_call(delay):
+    calls = []
+
+    def call():
+        calls.append(None)
+        time.sleep(delay)
+        return f'reply {len(calls)}'
+    return call, calls
+
+
+def test_concurrent_calls_in_two_workers_share_one_result(workers):
+    call, calls = counting_call(0.3)
+    results = []
+    threads = [threading.Thread(target=lambda flight=flight: results.append(flight.do('key', call))) for flight in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['reply 1', 'reply 1']
+    assert len(calls) == 1
+
+
+def test_result_is_not_reused_after_the_flight_lands(workers):
+    call, calls = counting_call(0)
+    first, second = workers
+
+    assert first.do('key', call) == 'reply 1'
+    assert second.do('key', call) == 'reply 2'
+    assert first.do('key', call) == 'reply 3'
+    assert second.stats()['shared_remote'] == 0
+
+
+def test_unlock_keeps_a_lock_taken_over_after_expiry(workers):
+    first, second = workers
+    lock_key = 'codesage:test:flight:key'
+    # The first flight's lock expired and another worker now holds it
+    second._redis.set(lock_key, 'other-token')
+
+    first._unlock(lock_key, 'first-token')
+    assert first._redis.get(lock_key) == b'other-token'
+
+    second._unlock(lock_key, 'other-token')
+    assert second._redis.get(lock_key) is None
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from database import db, unit_of_work
+from models.review import CodeReview
+from services import stats_service
+from utils.math_calculator import MetricsCalculator
+
+USER_ID = 1
+
+
+def add_review(score, age_minutes, status='completed'):
+    review = CodeReview(
+        user_id=USER_ID, title=str(score), code=f'x = {score}\n', language='python', status=status,
+        quality_score=score, created_at=datetime.utcnow() - timedelta(minutes=age_minutes)
+    )
+    db.session.add(review)
+    return review
+
+
+def test_out_of_order_completion_matches_a_rebuild(app):
+    with unit_of_work():
+        stats_service.record_review(add_review(70, age_minutes=5))
+    # Queued long ago, completed last: still the older review
+    queued = add_review(0, age_minutes=60, status='pending')
+    db.session.commit()
+    with unit_of_work():
+        queued.status = 'completed'
+        queued.quality_score = 40
+        stats_service.record_review(queued)
+    with unit_of_work():
+        stats_service.record_reviews(USER_ID, [add_review(90, age_minutes=1), add_review(10, age_minutes=30)])
+
+    stats = stats_service.get_user_stats(USER_ID)
+    assert stats.recent_scores == [90, 70, 10, 40]
+    assert stats.recent_scores == stats_service._aggregate_stats(USER_ID)['recent_scores']
+
+
+def test_missing_rollup_is_aggregated_once(app, monkeypatch):
+    add_review(80, age_minutes=1)
+    db.session.commit()
+    calls = []
+    aggregate = stats_service._aggregate_stats
+    monkeypatch.setattr(stats_service, '_aggregate_stats', lambda *args, **kwargs: calls.append(1) or aggregate(*args, **kwargs))
+
+    assert stats_service.get_user_stats(USER_ID).total_reviews == 1
+    assert len(calls) == 1
+
+
+def test_time_series_charts_completed_reviews_only(app):
+    add_review(80, age_minutes=5)
+    add_review(0, age_minutes=4, status='pending')
+    add_review(0, age_minutes=3, status='failed')
+    db.session.commit()
+
+    series = MetricsCalculator.calculate_time_series(USER_ID)
+    assert series['scores'] == [80]
+    assert series['review_counts'] == [1]
@@ -0,0 +1,23 @@
+from services.unread_counter import UnreadCounter
+
+
+def test_without_redis_counts_come_from_the_database():
+    counter = UnreadCounter()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return 3
+
+    # Another worker may have changed the count; nothing is kept per process
+    assert counter.get(1, loader) == 3
+    counter.adjust(1, -1)
+    assert counter.get(1, loader) == 3
+    assert len(loads) == 2
+
+
+def test_local_cache_is_opt_in():
+    counter = UnreadCounter(local_cache=True)
+    assert counter.get(1, lambda: 3) == 3
+    counter.adjust(1, -1)
+    assert counter.get(1, lambda: 99) == 2
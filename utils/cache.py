@@ -0,0 +1,176 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+def normalize_code(code):
+    """
+    Normalize submitted source so that equivalent submissions share a cache key
+    """
+    return code.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def content_key(code, *parts):
+    """
+    Build a content-addressed key from the sha256 of the normalized code
+    and any extra discriminators (language, analyzer version, model, ...)
+    """
+    digest = hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
+    return ':'.join([digest] + [str(part) for part in parts])
+
+
+class ResultCache:
+    """
+    Two-tier result cache: a size-bounded in-process LRU with TTL, backed by
+    an optional shared Redis tier. Values must be JSON serializable and are
+    shared between callers, so they must not be mutated after caching.
+    """
+
+    def __init__(self, namespace, max_size=1024, ttl=3600, redis_url=None):
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._counters = {
+            'hits': 0,
+            'misses': 0,
+            'redis_hits': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+        if redis_url and redis is not None:
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+
+    def _redis_key(self, key):
+        return f'codesage:{self.namespace}:{key}'
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _store_local(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counters['hits'] += 1
+                    return value
+                del self._entries[key]
+
+        if self._redis is not None:
+            try:
+                payload = self._redis.get(self._redis_key(key))
+            except Exception as e:
+                print(f"Cache Redis Error: {str(e)}")
+                self._count('errors')
+                payload = None
+
+            if payload is not None:
+                value = json.loads(payload)
+                self._store_local(key, value)
+                with self._lock:
+                    self._counters['hits'] += 1
+                    self._counters['redis_hits'] += 1
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key, value):
+        """
+        Store value under key in every available tier
+        """
+        self._store_local(key, value)
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self._redis_key(key), json.dumps(value), ex=self.ttl or None)
+            except Exception as e:
+                print(f"Cache Redis Error: {str(e)}")
+                self._count('errors')
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self._redis is not None:
+            try:
+                self._redis.delete(self._redis_key(key))
+            except Exception as e:
+                print(f"Cache Redis Error: {str(e)}")
+                self._count('errors')
+
+    def clear(self):
+        """
+        Drop all in-process entries (the shared Redis tier is left untouched)
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+
+        lookups = counters['hits'] + counters['misses']
+        counters.update({
+            'size': size,
+            'max_size': self.max_size,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else 0,
+            'redis_enabled': self._redis is not None
+        })
+        return counters
+
+
+analysis_cache = ResultCache(
+    'analysis',
+    max_size=Config.RESULT_CACHE_SIZE,
+    ttl=Config.RESULT_CACHE_TTL,
+    redis_url=Config.REDIS_URL
+)
+
+ai_review_cache = ResultCache(
+    'ai_review',
+    max_size=Config.RESULT_CACHE_SIZE,
+    ttl=Config.RESULT_CACHE_TTL,
+    redis_url=Config.REDIS_URL
+)
+
+github_cache = ResultCache(
+    'github',
+    max_size=Config.GITHUB_CACHE_SIZE,
+    ttl=Config.GITHUB_CACHE_TTL,
+    redis_url=Config.REDIS_URL
+)
+
+count_cache = ResultCache(
+    'counts',
+    max_size=Config.RESULT_CACHE_SIZE,
+    ttl=Config.COUNT_CACHE_TTL,
+    redis_url=Config.REDIS_URL
+)
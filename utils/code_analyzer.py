@@ -1,45 +1,196 @@
 import re
-from radon.complexity import cc_visit
-from radon.metrics import mi_visit, h_visit
+from radon.metrics import mi_compute, h_visit_ast
+from radon.raw import analyze as raw_analyze
+from radon.visitors import ComplexityVisitor
 import ast
+from utils.cache import analysis_cache, content_key, normalize_code
+
+
+class _PythonIssueVisitor(ast.NodeVisitor):
+    """
+    AST rule engine used by CodeAnalyzer to flag risky Python constructs
+    """
+    
+    DANGEROUS_CALLS = {
+        'eval': 'Use of eval() is dangerous',
+        'exec': 'Use of exec() is dangerous'
+    }
+    
+    def __init__(self):
+        self.issues = []
+    
+    def _add(self, node, severity, message):
+        self.issues.append({
+            'line': node.lineno,
+            'severity': severity,
+            'message': message
+        })
+    
+    def visit_Call(self, node):
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else None
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == 'builtins':
+            name = func.attr
+        if name in self.DANGEROUS_CALLS:
+            self._add(node, 'high', self.DANGEROUS_CALLS[name])
+        self.generic_visit(node)
+    
+    def visit_ExceptHandler(self, node):
+        if node.type is None:
+            self._add(node, 'medium', 'Bare except clause catches all exceptions')
+        self.generic_visit(node)
+    
+    def visit_ImportFrom(self, node):
+        if any(alias.name == '*' for alias in node.names):
+            self._add(node, 'medium', 'Avoid wildcard imports')
+        self.generic_visit(node)
+
 
 class CodeAnalyzer:
     """
     Static code analysis utility for measuring code quality metrics
     """
     
+    # Bump whenever analysis output changes so cached results are not reused
+    VERSION = '3'
+    
     def analyze(self, code, language='python'):
         """
         Perform comprehensive code analysis
         """
+        code = normalize_code(code)
+        cache_key = self.cache_key(code, language)
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = self.compute(code, language)
+        analysis_cache.set(cache_key, result)
+        return result
+    
+    def cache_key(self, code, language='python'):
+        """Result cache key for already normalized code"""
+        return content_key(code, language.lower(), self.VERSION)
+    
+    def compute(self, code, language='python'):
+        """
+        Run the analysis on normalized code without touching the result
+        cache (used by the analysis worker processes)
+        """
         if language.lower() == 'python':
             return self._analyze_python(code)
-        else:
-            return self._analyze_generic(code)
+        return self._analyze_generic(code)
+    
+    def chunk_code(self, code, language='python', max_chars=24000):
+        """
+        Split code into [(first_line, text), ...] pieces of at most about
+        max_chars. Python is cut only between top-level statements (and
+        between class members for oversized classes); other languages, and
+        anything that does not parse, are cut between lines.
+        """
+        lines = code.splitlines(keepends=True)
+        if len(code) <= max_chars:
+            return [(1, code)]
+        
+        units = None
+        if language.lower() == 'python':
+            try:
+                units = self._python_units(ast.parse(code).body, 1, len(lines) + 1, lines, max_chars)
+            except SyntaxError:
+                units = None
+        if units is None:
+            units = [(1, len(lines) + 1)]
+        
+        # A single statement still over the limit is cut between lines
+        split_units = []
+        for first, end in units:
+            if sum(len(line) for line in lines[first - 1:end - 1]) > max_chars:
+                split_units.extend((i, i + 1) for i in range(first, end))
+            else:
+                split_units.append((first, end))
+        units = split_units
+        
+        # Greedily pack consecutive units into chunks
+        chunks = []
+        start, size = None, 0
+        for first, end in units:
+            unit_size = sum(len(line) for line in lines[first - 1:end - 1])
+            if start is not None and size + unit_size > max_chars:
+                chunks.append((start, first))
+                start, size = None, 0
+            if start is None:
+                start = first
+            size += unit_size
+        if start is not None:
+            chunks.append((start, units[-1][1]))
+        
+        return [(first, ''.join(lines[first - 1:end - 1])) for first, end in chunks]
+    
+    def _python_units(self, body, start, end, lines, max_chars):
+        """
+        Cover lines [start, end) with (first, end) ranges that each hold one
+        statement of body, plus the blank lines before it and the comment
+        block directly above it.
+        Oversized classes are split further at their members.
+        """
+        units = []
+        for index, node in enumerate(body):
+            node_end = body[index + 1].lineno if index + 1 < len(body) else end
+            if index + 1 < len(body):
+                node_end = min([node_end] + [d.lineno for d in getattr(body[index + 1], 'decorator_list', [])])
+                # Comments directly above the next statement belong to it
+                while node_end - 1 > node.end_lineno and lines[node_end - 2].lstrip().startswith('#'):
+                    node_end -= 1
+            unit_start = start if index == 0 else units[-1][1]
+            
+            size = sum(len(line) for line in lines[unit_start - 1:node_end - 1])
+            if isinstance(node, ast.ClassDef) and size > max_chars and len(node.body) > 1:
+                # Keep the class header with its first member
+                members = self._python_units(node.body, unit_start, node_end, lines, max_chars)
+                units.extend(members)
+            else:
+                units.append((unit_start, node_end))
+        if units and units[-1][1] < end:
+            units[-1] = (units[-1][0], end)
+        return units or [(start, end)]
     
     def _analyze_python(self, code):
         """
-        Analyze Python code specifically
+        Analyze Python code specifically.
+
+        The source is parsed into a single AST and tokenized once; complexity,
+        Halstead, maintainability and issue detection all reuse those results
+        instead of re-parsing the code for every metric.
         """
         try:
+            tree = ast.parse(code)
+            raw = raw_analyze(code)
+            
             # Complexity analysis
-            complexity_results = cc_visit(code)
+            complexity_visitor = ComplexityVisitor.from_ast(tree)
+            complexity_results = complexity_visitor.blocks
             avg_complexity = sum(item.complexity for item in complexity_results) / len(complexity_results) if complexity_results else 0
             
-            # Maintainability index
-            mi_score = mi_visit(code, multi=True)
-            
             # Halstead metrics
-            halstead = h_visit(code)
+            halstead = h_visit_ast(tree)
+            
+            # Maintainability index (same inputs radon's mi_visit(code, multi=True) uses)
+            comment_percent = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc else 0
+            mi_score = mi_compute(
+                halstead.total.volume,
+                complexity_visitor.total_complexity,
+                raw.lloc,
+                comment_percent
+            )
             
-            # Line counts
+            # Line counts (a comment line is one that starts with '#')
             lines = code.split('\n')
             total_lines = len(lines)
-            code_lines = len([line for line in lines if line.strip() and not line.strip().startswith('#')])
-            comment_lines = len([line for line in lines if line.strip().startswith('#')])
+            comment_lines = sum(1 for line in lines if line.lstrip().startswith('#'))
+            code_lines = sum(1 for line in lines if line.strip()) - comment_lines
             
             # Issues detection
-            issues = self._detect_python_issues(code)
+            issues = self._detect_python_issues(code, tree)
             
             # Calculate quality score (0-100)
             quality_score = self._calculate_quality_score(
@@ -109,50 +260,30 @@ class CodeAnalyzer:
             'issues': issues
         }
     
-    def _detect_python_issues(self, code):
+    def _detect_python_issues(self, code, tree=None):
         """
-        Detect common Python code issues
+        Detect common Python code issues.
+
+        Syntax-level rules run as an AST visitor so that only real
+        ``eval``/``exec`` calls, bare ``except`` handlers and wildcard
+        imports are reported (not matches inside strings or comments).
         """
-        issues = []
-        lines = code.split('\n')
+        if tree is None:
+            tree = ast.parse(code)
         
-        for i, line in enumerate(lines, 1):
-            # Check for common issues
-            if 'eval(' in line:
-                issues.append({
-                    'line': i,
-                    'severity': 'high',
-                    'message': 'Use of eval() is dangerous'
-                })
-            
-            if 'exec(' in line:
-                issues.append({
-                    'line': i,
-                    'severity': 'high',
-                    'message': 'Use of exec() is dangerous'
-                })
-            
-            if 'import *' in line:
-                issues.append({
-                    'line': i,
-                    'severity': 'medium',
-                    'message': 'Avoid wildcard imports'
-                })
-            
+        visitor = _PythonIssueVisitor()
+        visitor.visit(tree)
+        issues = visitor.issues
+        
+        for i, line in enumerate(code.split('\n'), 1):
             if len(line) > 120:
                 issues.append({
                     'line': i,
                     'severity': 'low',
                     'message': 'Line too long (PEP 8 recommends max 79-120 chars)'
                 })
-            
-            if 'except:' in line and 'except Exception:' not in line:
-                issues.append({
-                    'line': i,
-                    'severity': 'medium',
-                    'message': 'Bare except clause catches all exceptions'
-                })
         
+        issues.sort(key=lambda issue: issue['line'])
         return issues
     
     def _calculate_quality_score(self, complexity, maintainability, issues_count, comment_ratio):
@@ -1,4 +1,6 @@
 from datetime import datetime, timedelta
+from sqlalchemy import case, func
+from database import db
 from models.review import CodeReview
 from models.portfolio import Portfolio
 
@@ -7,51 +9,120 @@ class MetricsCalculator:
     Calculate various metrics for code reviews and portfolio
     """
     
+    @staticmethod
+    def _completed_reviews(user_id, exclude_ids=()):
+        criteria = (CodeReview.user_id == user_id, CodeReview.status == 'completed')
+        if exclude_ids:
+            criteria += (CodeReview.id.notin_(exclude_ids),)
+        return criteria
+    
+    @staticmethod
+    def review_totals(user_id, exclude_ids=()):
+        """
+        Count, average and sum of quality scores and total issues computed
+        in one SQL aggregate query
+        """
+        total_reviews, avg_score, score_sum, total_issues = db.session.query(
+            func.count(CodeReview.id),
+            func.avg(CodeReview.quality_score),
+            func.coalesce(func.sum(CodeReview.quality_score), 0),
+            func.coalesce(func.sum(CodeReview.issues_found), 0)
+        ).filter(*MetricsCalculator._completed_reviews(user_id, exclude_ids)).one()
+        
+        return {
+            'total_reviews': total_reviews,
+            'avg_quality_score': round(avg_score or 0, 2),
+            'score_sum': float(score_sum),
+            'total_issues': int(total_issues)
+        }
+    
+    @staticmethod
+    def language_distribution(user_id, exclude_ids=()):
+        """
+        Number of reviews per language, grouped in SQL
+        """
+        rows = db.session.query(CodeReview.language, func.count(CodeReview.id))\
+            .filter(*MetricsCalculator._completed_reviews(user_id, exclude_ids))\
+            .group_by(CodeReview.language).all()
+        return {language: count for language, count in rows}
+    
+    @staticmethod
+    def recent_scores(user_id, limit=10, exclude_ids=()):
+        """
+        Most recent quality scores, newest first
+        """
+        return [score or 0 for (score,) in db.session.query(CodeReview.quality_score)
+                .filter(*MetricsCalculator._completed_reviews(user_id, exclude_ids))
+                .order_by(CodeReview.created_at.desc(), CodeReview.id.desc())
+                .limit(limit)]
+    
+    @staticmethod
+    def improvement_trend(scores):
+        """
+        Compare the last 5 quality scores with the 5 before them (scores newest first)
+        """
+        if len(scores) < 10:
+            return 'insufficient_data'
+        
+        recent_avg = sum(scores[:5]) / 5
+        previous_avg = sum(scores[5:10]) / 5
+        improvement = recent_avg - previous_avg
+        return 'improving' if improvement > 5 else 'stable' if improvement > -5 else 'declining'
+    
+    @staticmethod
+    def complexity_buckets(user_id, exclude_ids=()):
+        """
+        Complexity distribution bucketed with a SQL CASE expression
+        """
+        complexity = func.coalesce(CodeReview.complexity_score, 0)
+        bucket = case(
+            (complexity < 5, 'low'),
+            (complexity < 10, 'medium'),
+            (complexity < 15, 'high'),
+            else_='very_high'
+        )
+        rows = db.session.query(bucket, func.count(CodeReview.id))\
+            .filter(*MetricsCalculator._completed_reviews(user_id, exclude_ids))\
+            .group_by(bucket).all()
+        
+        distribution = {
+            'low': 0,      # complexity < 5
+            'medium': 0,   # complexity 5-10
+            'high': 0,     # complexity 10-15
+            'very_high': 0 # complexity > 15
+        }
+        distribution.update({name: count for name, count in rows})
+        
+        return distribution
+    
     @staticmethod
     def calculate_user_metrics(user_id):
         """
-        Calculate comprehensive user metrics
+        Calculate comprehensive user metrics from the user_review_stats rollup
         """
-        reviews = CodeReview.query.filter_by(user_id=user_id).all()
-        portfolio_projects = Portfolio.query.filter_by(user_id=user_id).all()
+        from services.stats_service import get_user_stats
+        
+        stats = get_user_stats(user_id)
+        totals = stats.to_dict()
+        portfolio_projects = db.session.query(func.count(Portfolio.id))\
+            .filter(Portfolio.user_id == user_id).scalar()
         
-        if not reviews:
+        if not totals['total_reviews']:
             return {
                 'total_reviews': 0,
                 'avg_quality_score': 0,
                 'total_issues': 0,
                 'languages': {},
-                'portfolio_projects': len(portfolio_projects),
+                'portfolio_projects': portfolio_projects,
                 'improvement_trend': 'N/A'
             }
         
-        # Basic stats
-        total_reviews = len(reviews)
-        avg_score = sum(r.quality_score for r in reviews) / total_reviews
-        total_issues = sum(r.issues_found for r in reviews)
-        
-        # Language distribution
-        languages = {}
-        for review in reviews:
-            languages[review.language] = languages.get(review.language, 0) + 1
-        
-        # Improvement trend (last 5 vs previous 5)
-        sorted_reviews = sorted(reviews, key=lambda x: x.created_at)
-        if len(sorted_reviews) >= 10:
-            recent_avg = sum(r.quality_score for r in sorted_reviews[-5:]) / 5
-            previous_avg = sum(r.quality_score for r in sorted_reviews[-10:-5]) / 5
-            improvement = recent_avg - previous_avg
-            trend = 'improving' if improvement > 5 else 'stable' if improvement > -5 else 'declining'
-        else:
-            trend = 'insufficient_data'
+        languages = totals['languages']
         
         return {
-            'total_reviews': total_reviews,
-            'avg_quality_score': round(avg_score, 2),
-            'total_issues': total_issues,
-            'languages': languages,
-            'portfolio_projects': len(portfolio_projects),
-            'improvement_trend': trend,
+            **totals,
+            'portfolio_projects': portfolio_projects,
+            'improvement_trend': MetricsCalculator.improvement_trend(stats.recent_scores),
             'most_used_language': max(languages, key=languages.get) if languages else 'None'
         }
     
@@ -63,25 +134,24 @@ class MetricsCalculator:
         end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
-        reviews = CodeReview.query.filter(
-            CodeReview.user_id == user_id,
+        # Only the two columns charted; queued and failed reviews have no score yet
+        rows = db.session.query(CodeReview.created_at, CodeReview.quality_score).filter(
+            *MetricsCalculator._completed_reviews(user_id),
             CodeReview.created_at >= start_date
         ).order_by(CodeReview.created_at).all()
         
         # Group by date
         data_by_date = {}
-        for review in reviews:
-            date_key = review.created_at.strftime('%Y-%m-%d')
+        for created_at, quality_score in rows:
+            date_key = created_at.strftime('%Y-%m-%d')
             if date_key not in data_by_date:
                 data_by_date[date_key] = {
                     'count': 0,
-                    'total_score': 0,
-                    'issues': 0
+                    'total_score': 0
                 }
             
             data_by_date[date_key]['count'] += 1
-            data_by_date[date_key]['total_score'] += review.quality_score
-            data_by_date[date_key]['issues'] += review.issues_found
+            data_by_date[date_key]['total_score'] += quality_score or 0
         
         # Format for charts
         dates = []
@@ -105,24 +175,6 @@ class MetricsCalculator:
         """
         Calculate distribution of code complexity
         """
-        reviews = CodeReview.query.filter_by(user_id=user_id).all()
-        
-        distribution = {
-            'low': 0,      # complexity < 5
-            'medium': 0,   # complexity 5-10
-            'high': 0,     # complexity 10-15
-            'very_high': 0 # complexity > 15
-        }
-        
-        for review in reviews:
-            complexity = review.complexity_score
-            if complexity < 5:
-                distribution['low'] += 1
-            elif complexity < 10:
-                distribution['medium'] += 1
-            elif complexity < 15:
-                distribution['high'] += 1
-            else:
-                distribution['very_high'] += 1
+        from services.stats_service import get_user_stats
         
-        return distribution
\ No newline at end of file
+        return get_user_stats(user_id).complexity_distribution()
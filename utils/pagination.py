@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, func, or_
+from config import Config
+from database import db
+from utils.cache import count_cache
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(item):
+    """
+    Opaque cursor pointing just past item in (created_at, id) descending order
+    """
+    payload = json.dumps([item.created_at.isoformat(), item.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid pagination cursor')
+
+
+def page_limit(value, default=None):
+    """
+    Clamp a client supplied page size to [1, MAX_PAGE_SIZE]
+    """
+    default = default or Config.DEFAULT_PAGE_SIZE
+    return max(1, min(value or default, Config.MAX_PAGE_SIZE))
+
+
+def keyset_page(query, model, cursor=None, limit=None):
+    """
+    Fetch one page of query ordered by (created_at, id) descending.
+
+    Instead of OFFSET, the cursor carries the last (created_at, id) seen, so
+    each page is a range scan on the (user_id, created_at, id) index no
+    matter how deep it is. Returns (items, next_cursor); next_cursor is None
+    on the last page.
+    """
+    limit = page_limit(limit)
+
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < item_id)
+        ))
+
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(items[limit - 1]) if len(items) > limit else None
+    return items[:limit], next_cursor
+
+
+def cached_total(model, user_id):
+    """
+    Row count for a user, cached briefly so paging does not COUNT(*) each time
+    """
+    key = f'{model.__tablename__}:{user_id}'
+    total = count_cache.get(key)
+    if total is None:
+        total = db.session.query(func.count(model.id)).filter(model.user_id == user_id).scalar()
+        count_cache.set(key, total)
+    return total
@@ -0,0 +1,129 @@
+import itertools
+import json
+import math
+import re
+
+SEVERITIES = ('low', 'medium', 'high')
+SEVERITY_ALIASES = {
+    'critical': 'high', 'error': 'high', 'major': 'high',
+    'warning': 'medium', 'minor': 'low', 'info': 'low'
+}
+
+LIST_FIELDS = ('best_practices', 'refactoring', 'security', 'performance', 'testing')
+
+_FENCE = re.compile(r'```(?:json|JSON)?\s*\n?(.*?)```', re.S)
+
+
+class InvalidReview(ValueError):
+    """Raised when a model reply cannot be read as a review"""
+
+
+def _balanced_objects(text):
+    """Yield each balanced {...} in text in order of its opening brace, skipping braces inside strings"""
+    start = text.find('{')
+    while start != -1:
+        depth = 0
+        in_string = escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    yield text[start:index + 1]
+                    break
+        start = text.find('{', start + 1)
+
+
+def extract_json(text):
+    """
+    Parse the JSON object in a model reply, tolerating markdown code fences
+    and prose around it (including prose that itself contains braces)
+    """
+    text = (text or '').strip()
+    candidates = [text]
+    candidates.extend(match.group(1).strip() for match in _FENCE.finditer(text))
+
+    for candidate in itertools.chain(candidates, _balanced_objects(text)):
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+    raise InvalidReview('No JSON object in model reply')
+
+
+def _text(item):
+    if isinstance(item, str):
+        return item.strip()
+    if isinstance(item, dict):
+        for key in ('description', 'message', 'suggestion', 'text', 'title'):
+            if isinstance(item.get(key), str):
+                return item[key].strip()
+    return json.dumps(item, sort_keys=True)
+
+
+def _line(value):
+    try:
+        line = int(value)
+    except (TypeError, ValueError):
+        return None
+    return line if line > 0 else None
+
+
+def _issue(item):
+    if not isinstance(item, dict):
+        return {'line': None, 'severity': 'medium', 'message': _text(item)}
+    severity = str(item.get('severity', 'medium')).lower()
+    severity = SEVERITY_ALIASES.get(severity, severity)
+    return {
+        'line': _line(item.get('line', item.get('line_number'))),
+        'severity': severity if severity in SEVERITIES else 'medium',
+        'message': _text(item)
+    }
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def normalize_review(data):
+    """
+    Validate a parsed review and coerce it to the compact typed shape every
+    consumer relies on: quality_score (float 0-100), summary (str), issues
+    ([{line, severity, message}]) and the LIST_FIELDS as lists of strings
+    """
+    if not isinstance(data, dict):
+        raise InvalidReview('Review must be a JSON object')
+
+    try:
+        quality_score = float(data['quality_score'])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidReview('quality_score is missing or not a number')
+    # float() accepts "NaN" and "inf", which the clamp below would turn into 100
+    if not math.isfinite(quality_score):
+        raise InvalidReview('quality_score is not a finite number')
+
+    review = {
+        'quality_score': round(max(0.0, min(100.0, quality_score)), 2),
+        'summary': _text(data.get('summary') or ''),
+        'issues': [_issue(item) for item in _as_list(data.get('issues'))]
+    }
+    for field in LIST_FIELDS:
+        review[field] = [text for text in (_text(item) for item in _as_list(data.get(field))) if text]
+    return review
@@ -0,0 +1,15 @@
+import json
+
+
+def sse_event(event, data, event_id=None):
+    """Format one Server-Sent Events frame"""
+    frame = f'event: {event}\n'
+    if event_id is not None:
+        frame += f'id: {event_id}\n'
+    return frame + f'data: {json.dumps(data)}\n\n'
+
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}